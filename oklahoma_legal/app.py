@@ -4,11 +4,13 @@ Oklahoma Constitution Search - Web Interface
 Flask application for semantic search of the Oklahoma Constitution
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
 from typing import List, Dict
+import json
+import logging
 import os
 import re
 
@@ -30,6 +32,9 @@ from supabase import create_client
 
 app = Flask(__name__)
 
+# Module loggers (rag_search) - INFO in production; LOG_LEVEL=DEBUG shows per-request detail
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(levelname)s %(name)s: %(message)s')
+
 # Security: Enable CORS with restrictions
 CORS(app, resources={
     r"/search": {"origins": "*"},
@@ -370,8 +375,11 @@ class SearchSystem:
 # Global search system instance
 search_system = SearchSystem()
 
-# Global RAG system instance
+# Global RAG system instance - one per worker process, initialized at startup so
+# its clients and index connections are reused by every request (the
+# per-request ready check still retries if this fails)
 rag_system = ConstitutionRAG()
+rag_system.initialize()
 
 # Global conversation manager instance
 conversation_manager = ConversationManager()
@@ -446,6 +454,41 @@ def search():
         print(f"Search error: {e}")
         return jsonify({'error': 'Search failed. Please try again.'}), 500
 
+def sse_event(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_answer_events(result: Dict, question: str, session_id: str):
+    """SSE stream for /ask: sources first, then answer deltas, then a done event"""
+    yield sse_event('sources', {'sources': result['sources'], 'question': question, 'session_id': session_id})
+
+    for delta in result['answer_stream']:
+        yield sse_event('delta', {'content': delta})
+
+    if 'error' in result:
+        yield sse_event('error', {'error': 'Unable to generate answer. Please try again.'})
+        return
+
+    # Store the exchange once the full answer is known
+    conversation_manager.add_message(session_id=session_id, role='user', content=question)
+    conversation_manager.add_message(
+        session_id=session_id,
+        role='assistant',
+        content=result['answer'],
+        metadata={
+            'tokens_used': result['tokens_used'],
+            'model': result['model'],
+            'num_sources': len(result['sources'])
+        }
+    )
+    print(f"[INFO] Stored conversation messages for session {session_id}")
+
+    yield sse_event('done', {
+        'tokens_used': result['tokens_used'],
+        'model': result['model'],
+        'session_id': session_id
+    })
+
 @app.route('/ask', methods=['POST'])
 @limiter.limit("10 per minute")  # Stricter limit for expensive GPT calls
 @optional_auth
@@ -461,11 +504,12 @@ def ask(current_user=None):
         if not question:
             return jsonify({'error': 'Please enter a question'}), 400
 
-        # Validate model selection (only allow approved models)
-        model = data.get('model', 'gpt-3.5-turbo')
-        allowed_models = ['gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo-preview']
+        # Validate model selection (only allow approved models); None lets the
+        # RAG system pick gpt-4o-mini, escalating to gpt-4o for harder questions
+        model = data.get('model')
+        allowed_models = ['gpt-4o-mini', 'gpt-4o', 'gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo-preview']
         if model not in allowed_models:
-            model = 'gpt-3.5-turbo'
+            model = None
 
         # Validate num_sources
         num_sources = data.get('num_sources', 3)
@@ -496,7 +540,7 @@ def ask(current_user=None):
             session_id = conversation_manager.create_session(
                 user_id=user_id,
                 user_ip=user_ip,
-                metadata={'model': model}
+                metadata={'model': model or 'auto'}
             )
             print(f"[INFO] Created new conversation session: {session_id}")
 
@@ -509,17 +553,28 @@ def ask(current_user=None):
             if not rag_system.initialize():
                 return jsonify({'error': 'Service temporarily unavailable'}), 503
 
+        # Optional Server-Sent Events response: answer text is sent as it's generated
+        stream = data.get('stream') is True
+
         # Get answer with conversation history
         result = rag_system.ask_question(
             question,
             num_sources=num_sources,
             model=model,
-            conversation_history=conversation_history
+            conversation_history=conversation_history,
+            stream=stream
         )
 
         if 'error' in result:
             return jsonify({'error': 'Unable to generate answer. Please try again.'}), 500
 
+        if stream:
+            return Response(
+                stream_with_context(stream_answer_events(result, question, session_id)),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
         # Store the user's question and assistant's answer in conversation history
         conversation_manager.add_message(
             session_id=session_id,
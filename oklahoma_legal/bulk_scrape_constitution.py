@@ -188,13 +188,17 @@ def bulk_scrape_constitution(cite_ids, force_update=False):
     for key, value in stats.items():
         print(f"  {key}: {value}")
 
-def main():
+def main(args=None):
+    """Run the bulk scraper; args defaults to the command line arguments"""
+    if args is None:
+        args = sys.argv[1:]
+
     print("Oklahoma Constitution Bulk Scraper")
     print("=" * 40)
 
     # Check command line arguments
-    force_update = '--force' in sys.argv
-    search_mode = '--search' in sys.argv
+    force_update = '--force' in args
+    search_mode = '--search' in args
 
     if search_mode:
         print("Search mode: Looking for constitution sections...")
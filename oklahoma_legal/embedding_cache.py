@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Persistent embedding cache keyed by content hash
+
+Stores embedding vectors in a local SQLite database so re-runs of the
+statute pipeline don't re-embed text that was already sent to OpenAI.
+Vectors are stored as float32 bytes (Pinecone stores float32 anyway).
+With numpy installed, vectors stay float32 arrays until the upload edge.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from typing import Callable, Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_CACHE_PATH = 'embedding_cache.sqlite3'
+
+# SQLite's default limit on host parameters is 999
+_MAX_QUERY_PARAMS = 900
+
+class EmbeddingCache:
+    def __init__(self, model: str, path: str = DEFAULT_CACHE_PATH):
+        """
+        Open (or create) the cache
+
+        Args:
+            model: Embedding model name - vectors are only reused for the same model
+            path: SQLite database file
+        """
+        self.model = model
+        self.path = path
+        # Uploads run on worker threads; the lock serializes access. The
+        # timeout covers other processes (--titles) writing the same file.
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                sha256 BLOB NOT NULL,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (sha256, model)
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def content_hash(text: str) -> bytes:
+        """SHA-256 digest of the text"""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def get_many(self, hashes: List[bytes]) -> Dict[bytes, List[float]]:
+        """Return cached vectors for the given hashes (misses are omitted)"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self.lock:
+            for i in range(0, len(unique), _MAX_QUERY_PARAMS):
+                chunk = unique[i:i + _MAX_QUERY_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT sha256, vector FROM embedding_cache "
+                    f"WHERE model = ? AND sha256 IN ({placeholders})",
+                    [self.model, *chunk]
+                )
+                for sha, blob in rows:
+                    if NUMPY_AVAILABLE:
+                        # Zero-copy view, no per-float Python objects
+                        found[sha] = np.frombuffer(blob, dtype=np.float32)
+                    else:
+                        found[sha] = array('f', blob).tolist()
+
+        return found
+
+    def put_many(self, items: Dict[bytes, List[float]]):
+        """Store vectors by hash (existing entries are kept)"""
+        if NUMPY_AVAILABLE:
+            matrix = np.asarray(list(items.values()), dtype=np.float32)
+            rows = [(sha, self.model, row.tobytes()) for sha, row in zip(items, matrix)]
+        else:
+            rows = [(sha, self.model, array('f', vector).tobytes()) for sha, vector in items.items()]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (sha256, model, vector) VALUES (?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def embed(self, texts: List[str], create_embeddings: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Embed texts, calling create_embeddings once per distinct uncached text
+
+        Returns:
+            One vector per text (in order; float32 arrays when numpy is
+            installed, else lists), or [] if embedding the misses failed
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        vectors = self.get_many(hashes)
+
+        # Unique misses only - duplicate texts in a batch are embedded once
+        # and scattered back to every position below
+        misses = {}
+        for text, sha in zip(texts, hashes):
+            if sha not in vectors:
+                misses.setdefault(sha, text)
+
+        if misses:
+            print(f"  Embedding cache: {len(texts) - len(misses)} reused, {len(misses)} to embed")
+            # Length-sorted so similar-sized texts share a request batch;
+            # results map back by hash, so no un-sorting is needed
+            pending = sorted(misses.items(), key=lambda item: len(item[1]))
+            new_embeddings = create_embeddings([text for _, text in pending])
+            if not new_embeddings or len(new_embeddings) != len(pending):
+                return []
+
+            if NUMPY_AVAILABLE:
+                new_embeddings = np.asarray(new_embeddings, dtype=np.float32)
+            new_vectors = {sha: embedding for (sha, _), embedding in zip(pending, new_embeddings)}
+            self.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[sha] for sha in hashes]
+
+    def close(self):
+        self.conn.close()
@@ -7,11 +7,12 @@ Optimized version with improved text processing and structure detection
 import requests
 from bs4 import BeautifulSoup, NavigableString, Comment
 import time
-import json
 import re
 from urllib.parse import urljoin, urlparse
 import logging
 
+from refined_oklahoma_scraper import jsonl_line
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -293,50 +294,50 @@ def test_final_scraper():
         # Add more if you have other cite IDs to test
     ]
 
-    for cite_id in test_statutes:
-        print(f"\n{'='*60}")
-        print(f"TESTING STATUTE {cite_id}")
-        print('='*60)
+    # One JSON Lines file for the whole run, opened once
+    with open('statute_results_final.jsonl', 'ab') as results_file:
+        for cite_id in test_statutes:
+            print(f"\n{'='*60}")
+            print(f"TESTING STATUTE {cite_id}")
+            print('='*60)
 
-        result = scraper.scrape_statute(cite_id)
+            result = scraper.scrape_statute(cite_id)
 
-        if result:
-            print(f"[SUCCESS] Successfully scraped statute {cite_id}")
+            if result:
+                print(f"[SUCCESS] Successfully scraped statute {cite_id}")
 
-            # Display metadata
-            print("\n[METADATA]:")
-            metadata = result['metadata']
-            for key, value in metadata.items():
-                print(f"  {key}: {value}")
+                # Display metadata
+                print("\n[METADATA]:")
+                metadata = result['metadata']
+                for key, value in metadata.items():
+                    print(f"  {key}: {value}")
 
-            # Display content summary
-            print("\n[CONTENT SUMMARY]:")
-            content = result['content']
+                # Display content summary
+                print("\n[CONTENT SUMMARY]:")
+                content = result['content']
 
-            if 'definitions' in content and content['definitions']:
-                print(f"  [DEFINITIONS] Found {len(content['definitions'])} definitions:")
-                for defn in content['definitions'][:3]:  # Show first 3
-                    print(f"    {defn['number']}. {defn['term']}: {defn['definition'][:100]}...")
+                if 'definitions' in content and content['definitions']:
+                    print(f"  [DEFINITIONS] Found {len(content['definitions'])} definitions:")
+                    for defn in content['definitions'][:3]:  # Show first 3
+                        print(f"    {defn['number']}. {defn['term']}: {defn['definition'][:100]}...")
 
-            if 'main_text' in content:
-                print(f"  [TEXT] Main text length: {len(content['main_text'])} characters")
-                print(f"  [PREVIEW] {content['main_text'][:150]}...")
+                if 'main_text' in content:
+                    print(f"  [TEXT] Main text length: {len(content['main_text'])} characters")
+                    print(f"  [PREVIEW] {content['main_text'][:150]}...")
 
-            if 'historical_data' in content and content['historical_data']:
-                print(f"  [HISTORICAL] {content['historical_data']}")
+                if 'historical_data' in content and content['historical_data']:
+                    print(f"  [HISTORICAL] {content['historical_data']}")
 
-            # Display citations
-            if 'citations' in result and result['citations']:
-                print(f"\n[CITATIONS] {len(result['citations'].get('references', []))} found")
+                # Display citations
+                if 'citations' in result and result['citations']:
+                    print(f"\n[CITATIONS] {len(result['citations'].get('references', []))} found")
 
-            # Save individual result
-            filename = f'statute_{cite_id}_final.json'
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            print(f"  [SAVED] to: {filename}")
+                # Save result as one line
+                results_file.write(jsonl_line(result))
+                print("  [SAVED] to: statute_results_final.jsonl")
 
-        else:
-            print(f"[FAILED] Failed to scrape statute {cite_id}")
+            else:
+                print(f"[FAILED] Failed to scrape statute {cite_id}")
 
 if __name__ == "__main__":
     test_final_scraper()
\ No newline at end of file
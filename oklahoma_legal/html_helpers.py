@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+HTML parsing helpers shared by the statute and AG opinion scrapers
+"""
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.builder import ParserRejectedMarkup
+
+try:
+    from lxml import etree, html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    # Falls back to BeautifulSoup traversal (slower)
+    LXML_AVAILABLE = False
+
+def make_soup(html, parse_only=None):
+    """Parse HTML with the C-backed lxml parser, falling back to html.parser"""
+    try:
+        return BeautifulSoup(html, 'lxml', parse_only=parse_only)
+    except (FeatureNotFound, ParserRejectedMarkup):
+        return BeautifulSoup(html, 'html.parser', parse_only=parse_only)
+
+def make_tree(html):
+    """Parse HTML into an lxml tree for XPath queries (None without lxml or on unparseable input)"""
+    if not LXML_AVAILABLE:
+        return None
+    try:
+        return lxml_html.fromstring(html)
+    except (ValueError, etree.LxmlError):
+        return None
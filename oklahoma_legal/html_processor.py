@@ -130,13 +130,15 @@ class StatuteHTMLProcessor:
             print(f"[ERROR] Failed to parse {html_path}: {e}")
             return None
 
-    def process_all_html_files(self, start_title: Optional[int] = None, end_title: Optional[int] = None):
+    def process_all_html_files(self, start_title: Optional[int] = None, end_title: Optional[int] = None,
+                               files: Optional[List[Path]] = None):
         """
         Process all HTML files and upload to databases
 
         Args:
             start_title: Optional starting title number (1-85)
             end_title: Optional ending title number (1-85)
+            files: Optional pre-enumerated HTML files; skips directory discovery
         """
         print("Oklahoma Statutes HTML Processor")
         print("=" * 60)
@@ -159,20 +161,23 @@ class StatuteHTMLProcessor:
             print("  python -c \"from vector_database_builder import *; create_statute_index()\"")
             return
 
-        # Find all HTML files
-        html_files = []
-        for title_dir in sorted(self.html_dir.glob('title_*')):
-            if not title_dir.is_dir():
-                continue
+        # Find all HTML files (unless the caller already enumerated them)
+        if files is not None:
+            html_files = list(files)
+        else:
+            html_files = []
+            for title_dir in sorted(self.html_dir.glob('title_*')):
+                if not title_dir.is_dir():
+                    continue
 
-            # Check if within title range
-            title_num = int(title_dir.name.replace('title_', ''))
-            if start_title and title_num < start_title:
-                continue
-            if end_title and title_num > end_title:
-                continue
+                # Check if within title range
+                title_num = int(title_dir.name.replace('title_', ''))
+                if start_title and title_num < start_title:
+                    continue
+                if end_title and title_num > end_title:
+                    continue
 
-            html_files.extend(sorted(title_dir.glob('*.html')))
+                html_files.extend(sorted(title_dir.glob('*.html')))
 
         total_files = len(html_files)
         print(f"\nFound {total_files} HTML files to process")
@@ -205,11 +210,14 @@ class StatuteHTMLProcessor:
         records_batch = []
         batch_size = 50  # Process in batches
 
+        # Hash set (not a list) so resume checks are O(1); bound locally for the loop
+        processed = self.processed
+
         for i, html_path in enumerate(html_files, 1):
             cite_id = html_path.stem.replace('cite_', '')
 
             # Skip if already processed
-            if cite_id in self.processed:
+            if cite_id in processed:
                 skipped_count += 1
                 if i % 100 == 0:
                     print(f"[{i}/{total_files}] Skipped {cite_id} (already processed)")
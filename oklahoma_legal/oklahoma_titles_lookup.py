@@ -4,7 +4,11 @@ Oklahoma Statutes - Title Names Lookup Table
 Complete list of all 85 Oklahoma Statute Titles
 """
 
-OKLAHOMA_TITLES = {
+from collections.abc import Mapping
+from functools import lru_cache
+import sys
+
+_TITLE_DATA = {
     # Based on Oklahoma Statutes Citationized - Title Names
     "1": "Civil Procedure",
     "2": "Corporations",
@@ -95,13 +99,41 @@ OKLAHOMA_TITLES = {
     "85": "Waters and Water Rights"
 }
 
+
+class TitleTable(Mapping):
+    """Read-only title lookup backed by two parallel tuples of interned strings"""
+
+    __slots__ = ('_keys', '_vals', '_index')
+
+    def __init__(self, data):
+        self._keys = tuple(sys.intern(k) for k in data)
+        self._vals = tuple(sys.intern(v) for v in data.values())
+        self._index = {k: i for i, k in enumerate(self._keys)}
+
+    def __getitem__(self, key):
+        return self._vals[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+OKLAHOMA_TITLES = TitleTable(_TITLE_DATA)
+del _TITLE_DATA
+
 # Constitution mapping
 OKLAHOMA_CONSTITUTION = {
     "CONST": "Oklahoma Constitution"
 }
 
+@lru_cache(maxsize=256)
 def get_title_name(title_number: str) -> str:
-    """Get title name from title number"""
+    """Get title name from title number (memoized - called once per parsed file)"""
     title_num = str(title_number).strip()
 
     # Check if it's the Constitution
@@ -113,7 +145,7 @@ def get_title_name(title_number: str) -> str:
 
 def get_all_titles():
     """Get all title mappings including Constitution"""
-    all_titles = OKLAHOMA_TITLES.copy()
+    all_titles = dict(OKLAHOMA_TITLES)
     all_titles.update(OKLAHOMA_CONSTITUTION)
     return all_titles
 
@@ -3,11 +3,121 @@
 Process Oklahoma Constitution PDF and populate database
 """
 
+import asyncio
+import io
 import re
+import sys
 import json
+import logging
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from supabase_client import StatutesDatabase
 
+try:
+    import hyperscan  # Optional: multi-pattern DFA for header scanning
+except ImportError:
+    hyperscan = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Emit per-item progress only every N pages/records
+PROGRESS_EVERY = 50
+
+# Max concurrent Supabase requests in create_database_records
+UPSERT_CONCURRENCY = 16
+
+_URL_PREFIX = sys.intern("https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID=")
+
+# Structure patterns run over the UTF-8 encoded text: the constitution is
+# almost entirely ASCII, and bytes regexes skip unicode property checks.
+# En/em dashes are spelled out as their UTF-8 byte sequences.
+_DASH = rb'(?:-|\xe2\x80\x93|\xe2\x80\x94)'
+# Bounded article number with a word boundary, so words that merely start
+# with I/V/X ("ARTICLE involves ...") are rejected inside the regex VM
+_ARTICLE_NUM = rb'([IVX]{1,6}|[0-9]{1,3})\b'
+_ARTICLE_RE = re.compile(
+    rb'ARTICLE\s+' + _ARTICLE_NUM + rb'[.\s]*' + _DASH + rb'?\s*(.+?)(?=\n)',
+    re.IGNORECASE | re.MULTILINE
+)
+_SECTION_RE = re.compile(
+    rb'(?:SECTION|Section|Sec\.?)\s+([0-9]+[a-zA-Z]?)[.\s]*' + _DASH + rb'?\s*(.+?)(?=\n)',
+    re.IGNORECASE | re.MULTILINE
+)
+_HEADER_RE = re.compile(
+    rb'((?:ARTICLE\s+(?:[IVX]{1,6}|[0-9]{1,3})\b|SECTION\s+[0-9]+[a-zA-Z]?)[.\s]*' + _DASH + rb'?\s*[^\n]+)',
+    re.IGNORECASE | re.MULTILINE
+)
+_ARTICLE_HEADER_RE = re.compile(
+    rb'ARTICLE\s+' + _ARTICLE_NUM + rb'[.\s]*' + _DASH + rb'?\s*(.+)', re.IGNORECASE
+)
+_SECTION_HEADER_RE = re.compile(
+    rb'SECTION\s+([0-9]+[a-zA-Z]?)[.\s]*' + _DASH + rb'?\s*(.+)', re.IGNORECASE
+)
+
+_ROMAN_NUMERAL_RE = re.compile(
+    rb'^M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$', re.IGNORECASE
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_header_scanner = None
+
+def _get_header_scanner():
+    """Compile (once) a Hyperscan database for the header prefixes"""
+    global _header_scanner
+    if _header_scanner is None:
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[rb'ARTICLE\s+[IVX0-9]', rb'SECTION\s+[0-9]'],
+            ids=[0, 1],
+            elements=2,
+            flags=[flags, flags]
+        )
+        _header_scanner = db
+    return _header_scanner
+
+def find_header_matches(text):
+    """
+    Find section/article header matches in UTF-8 bytes.
+
+    With hyperscan installed, candidate header starts are found in a single
+    DFA pass and only those offsets are confirmed with _HEADER_RE. Results
+    are identical to _HEADER_RE.finditer(text).
+    """
+    if hyperscan is None:
+        return list(_HEADER_RE.finditer(text))
+
+    starts = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        starts.add(start)
+
+    _get_header_scanner().scan(text, match_event_handler=on_match)
+
+    matches = []
+    last_end = 0
+    for start in sorted(starts):
+        if start < last_end:
+            continue
+        match = _HEADER_RE.match(text, start)
+        if match:
+            matches.append(match)
+            last_end = match.end()
+    return matches
+
+@dataclass(slots=True)
+class StatuteRecord:
+    """Constitution section record; converted to the insert_statute dict shape at the edge"""
+    cite_id: str
+    url: str
+    metadata: dict
+    content: dict
+    citations: dict = field(default_factory=dict)
+    source: str = 'pdf_manual'
+    scraper_version: str = '1.2'
+
 def install_pdf_dependencies():
     """Install required packages for PDF processing"""
     import subprocess
@@ -55,21 +165,25 @@ class PDFConstitutionProcessor:
 
         print(f"Processing PDF with pdfplumber: {pdf_path}")
 
-        full_text = ""
+        buffer = io.BytesIO()
 
         with pdfplumber.open(pdf_path) as pdf:
             print(f"PDF has {len(pdf.pages)} pages")
 
+            page_count = len(pdf.pages)
             for i, page in enumerate(pdf.pages):
-                print(f"  Processing page {i+1}/{len(pdf.pages)}")
+                if i % PROGRESS_EVERY == 0:
+                    logger.info(f"Processing page {i+1}/{page_count}")
                 text = page.extract_text()
                 if text:
-                    full_text += text + "\n\n"
+                    buffer.write(text.encode('utf-8'))
+                    buffer.write(b"\n\n")
 
-        print(f"✓ Extracted {len(full_text)} characters of text")
+        full_text = buffer.getvalue()
+        print(f"✓ Extracted {len(full_text)} bytes of text")
 
         # Save raw extracted text
-        with open('constitution_raw_text.txt', 'w', encoding='utf-8') as f:
+        with open('constitution_raw_text.txt', 'wb') as f:
             f.write(full_text)
 
         print("✓ Saved raw text to: constitution_raw_text.txt")
@@ -90,61 +204,101 @@ class PDFConstitutionProcessor:
 
         print(f"Processing PDF with PyPDF2: {pdf_path}")
 
-        full_text = ""
+        buffer = io.BytesIO()
 
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
             print(f"PDF has {len(reader.pages)} pages")
 
+            page_count = len(reader.pages)
             for i, page in enumerate(reader.pages):
-                print(f"  Processing page {i+1}/{len(reader.pages)}")
+                if i % PROGRESS_EVERY == 0:
+                    logger.info(f"Processing page {i+1}/{page_count}")
                 text = page.extract_text()
                 if text:
-                    full_text += text + "\n\n"
+                    buffer.write(text.encode('utf-8'))
+                    buffer.write(b"\n\n")
 
-        print(f"✓ Extracted {len(full_text)} characters of text")
+        full_text = buffer.getvalue()
+        print(f"✓ Extracted {len(full_text)} bytes of text")
 
         # Save raw extracted text
-        with open('constitution_raw_text_pypdf2.txt', 'w', encoding='utf-8') as f:
+        with open('constitution_raw_text_pypdf2.txt', 'wb') as f:
             f.write(full_text)
 
         print("✓ Saved raw text to: constitution_raw_text_pypdf2.txt")
 
         return full_text
 
+    def sniff_extractor(self, pdf_path):
+        """
+        Extract only the first page with both libraries and return the name
+        of the one that yields more non-whitespace text ('pdfplumber' or
+        'pypdf2'), so the full document is only extracted once.
+        """
+
+        scores = {}
+
+        try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path) as pdf:
+                text = pdf.pages[0].extract_text() if pdf.pages else ''
+            scores['pdfplumber'] = len(_WHITESPACE_RE.sub('', text or ''))
+        except Exception as e:
+            print(f"pdfplumber probe failed: {e}")
+
+        try:
+            import PyPDF2
+            with open(pdf_path, 'rb') as file:
+                reader = PyPDF2.PdfReader(file)
+                text = reader.pages[0].extract_text() if reader.pages else ''
+            scores['pypdf2'] = len(_WHITESPACE_RE.sub('', text or ''))
+        except Exception as e:
+            print(f"PyPDF2 probe failed: {e}")
+
+        print(f"Page 1 probe (non-whitespace chars): {scores}")
+
+        if not scores:
+            return 'pdfplumber'
+        # Ties go to pdfplumber (better text extraction)
+        return max(scores, key=lambda name: (scores[name], name == 'pdfplumber'))
+
     def parse_constitution_structure(self, text):
-        """Parse the constitution text into articles and sections"""
+        """Parse the constitution text (UTF-8 bytes or str) into articles and sections"""
 
         print("Parsing constitution structure...")
 
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+
         # Common patterns for Oklahoma Constitution structure
         constitution_sections = []
 
         # Look for Article patterns
-        article_pattern = r'ARTICLE\s+([IVX]+|[0-9]+)[.\s]*[-–—]?\s*(.+?)(?=\n)'
-        articles = re.finditer(article_pattern, text, re.IGNORECASE | re.MULTILINE)
+        articles = _ARTICLE_RE.finditer(text)
 
+        log_articles = logger.isEnabledFor(logging.DEBUG)
         article_count = 0
         for article_match in articles:
-            article_number = article_match.group(1).strip()
-            article_title = article_match.group(2).strip()
             article_count += 1
 
-            print(f"  Found Article {article_number}: {article_title[:50]}...")
+            if log_articles:
+                article_number = article_match.group(1).strip().decode('utf-8')
+                article_title = article_match.group(2).strip().decode('utf-8')
+                logger.debug(f"Found Article {article_number}: {article_title[:50]}...")
 
         print(f"✓ Found {article_count} articles")
 
         # Look for Section patterns within articles
-        section_pattern = r'(?:SECTION|Section|Sec\.?)\s+([0-9]+[a-zA-Z]?)[.\s]*[-–—]?\s*(.+?)(?=\n)'
-        sections = re.finditer(section_pattern, text, re.IGNORECASE | re.MULTILINE)
+        sections = _SECTION_RE.finditer(text)
 
         section_count = 0
         for section_match in sections:
-            section_number = section_match.group(1).strip()
-            section_title = section_match.group(2).strip()
             section_count += 1
 
             if section_count <= 10:  # Show first 10 as examples
+                section_number = section_match.group(1).strip().decode('utf-8')
+                section_title = section_match.group(2).strip().decode('utf-8')
                 print(f"  Found Section {section_number}: {section_title[:50]}...")
 
         print(f"✓ Found {section_count} sections")
@@ -155,7 +309,7 @@ class PDFConstitutionProcessor:
         return constitution_sections
 
     def extract_detailed_sections(self, text):
-        """Extract individual sections with their full content"""
+        """Extract individual sections with their full content from UTF-8 bytes"""
 
         print("Extracting detailed sections...")
 
@@ -165,9 +319,7 @@ class PDFConstitutionProcessor:
         # This is a simplified approach - might need refinement based on actual PDF structure
 
         # Look for section headers and extract content until next section
-        section_pattern = r'((?:ARTICLE\s+[IVX0-9]+|SECTION\s+[0-9]+[a-zA-Z]?)[.\s]*[-–—]?\s*[^\n]+)'
-
-        section_matches = list(re.finditer(section_pattern, text, re.IGNORECASE | re.MULTILINE))
+        section_matches = find_header_matches(text)
 
         for i, match in enumerate(section_matches):
             header = match.group(1)
@@ -179,12 +331,11 @@ class PDFConstitutionProcessor:
             else:
                 end_pos = len(text)
 
-            content = text[start_pos:end_pos].strip()
-
             # Parse the header to extract article/section info
             section_info = self.parse_section_header(header)
             if section_info:
-                section_info['content'] = content
+                # Only decode the slices we keep
+                section_info['content'] = text[start_pos:end_pos].decode('utf-8').strip()
                 sections.append(section_info)
 
         print(f"✓ Extracted {len(sections)} detailed sections")
@@ -198,28 +349,34 @@ class PDFConstitutionProcessor:
         return sections
 
     def parse_section_header(self, header):
-        """Parse a section header to extract article and section info"""
+        """Parse a section header (UTF-8 bytes or str) to extract article and section info"""
 
+        if isinstance(header, str):
+            header = header.encode('utf-8')
         header = header.strip()
 
         # Try to match Article pattern
-        article_match = re.match(r'ARTICLE\s+([IVX]+|[0-9]+)[.\s]*[-–—]?\s*(.+)', header, re.IGNORECASE)
+        article_match = _ARTICLE_HEADER_RE.match(header)
         if article_match:
+            article_number = article_match.group(1)
+            # Reject malformed numerals such as "IIII" or "VX"
+            if not article_number.isdigit() and not _ROMAN_NUMERAL_RE.match(article_number):
+                return None
             return {
                 'type': 'article',
-                'article_number': article_match.group(1),
-                'title': article_match.group(2).strip(),
+                'article_number': article_number.decode('utf-8'),
+                'title': article_match.group(2).decode('utf-8').strip(),
                 'section_number': None
             }
 
         # Try to match Section pattern
-        section_match = re.match(r'SECTION\s+([0-9]+[a-zA-Z]?)[.\s]*[-–—]?\s*(.+)', header, re.IGNORECASE)
+        section_match = _SECTION_HEADER_RE.match(header)
         if section_match:
             return {
                 'type': 'section',
                 'article_number': None,  # Would need to track current article
-                'section_number': section_match.group(1),
-                'title': section_match.group(2).strip()
+                'section_number': section_match.group(1).decode('utf-8'),
+                'title': section_match.group(2).decode('utf-8').strip()
             }
 
         return None
@@ -238,60 +395,77 @@ class PDFConstitutionProcessor:
             print("No existing cite IDs found - will create new records")
             existing_cite_ids = []
 
-        created_count = 0
-        updated_count = 0
-
-        for i, section in enumerate(sections):
-            try:
-                # Create a cite ID (you might need to adjust this logic)
-                cite_id = str(400000 + i)  # Start from a base number
-
-                # If we have existing cite IDs, try to use them
-                if i < len(existing_cite_ids):
-                    cite_id = existing_cite_ids[i]
-
-                # Create statute data structure
-                statute_data = {
-                    'cite_id': cite_id,
-                    'url': f"https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID={cite_id}",
-                    'metadata': {
-                        'title_number': 'CONST',
-                        'title_name': 'Oklahoma Constitution',
-                        'article_number': section.get('article_number'),
-                        'article_name': section.get('title') if section['type'] == 'article' else None,
-                        'section_number': section.get('section_number'),
-                        'section_name': section.get('title'),
-                        'page_title': section.get('title'),
-                    },
-                    'content': {
-                        'main_text': section.get('content', ''),
-                        'paragraphs': [{'text': section.get('content', ''), 'is_historical': False}]
-                    },
-                    'citations': {},
-                    'source': 'pdf_manual',
-                    'scraper_version': '1.2'
-                }
-
-                # Check if record exists and update or create
-                existing = self.db.get_statute(cite_id)
-
-                if existing:
-                    print(f"  Updating existing record for CiteID {cite_id}")
-                    # Update logic here
-                    updated_count += 1
-                else:
-                    print(f"  Creating new record for CiteID {cite_id}")
-                    result = self.db.insert_statute(statute_data)
-                    if result['success']:
-                        created_count += 1
-
-            except Exception as e:
-                print(f"  ❌ Error processing section {i}: {e}")
+        results = asyncio.run(self._upsert_sections(sections, existing_cite_ids))
+        created_count = results.count('created')
+        updated_count = results.count('updated')
 
         print(f"\n✓ Database update completed:")
         print(f"  Created: {created_count}")
         print(f"  Updated: {updated_count}")
 
+    async def _upsert_sections(self, sections, existing_cite_ids):
+        """
+        Check/insert every section concurrently. The Supabase client is
+        synchronous, so each call runs in a worker thread; the semaphore
+        bounds how many requests are in flight.
+
+        Returns one of 'created', 'updated' or None per section.
+        """
+        semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
+
+        async def maybe_upsert(i, section):
+            async with semaphore:
+                if i % PROGRESS_EVERY == 0:
+                    logger.info(f"Creating records {i+1}/{len(sections)}")
+                try:
+                    # Create a cite ID (you might need to adjust this logic)
+                    cite_id = str(400000 + i)  # Start from a base number
+
+                    # If we have existing cite IDs, try to use them
+                    if i < len(existing_cite_ids):
+                        cite_id = existing_cite_ids[i]
+
+                    # Create statute record
+                    title = section.get('title')
+                    content = section.get('content', '')
+                    record = StatuteRecord(
+                        cite_id=cite_id,
+                        url=_URL_PREFIX + cite_id,
+                        metadata={
+                            'title_number': 'CONST',
+                            'title_name': 'Oklahoma Constitution',
+                            'article_number': section.get('article_number'),
+                            'article_name': title if section['type'] == 'article' else None,
+                            'section_number': section.get('section_number'),
+                            'section_name': title,
+                            'page_title': title,
+                        },
+                        content={
+                            'main_text': content,
+                            'paragraphs': [{'text': content, 'is_historical': False}]
+                        }
+                    )
+
+                    # Check if record exists and update or create
+                    existing = await asyncio.to_thread(self.db.get_statute, cite_id)
+
+                    if existing:
+                        logger.debug(f"Updating existing record for CiteID {cite_id}")
+                        # Update logic here
+                        return 'updated'
+
+                    logger.debug(f"Creating new record for CiteID {cite_id}")
+                    result = await asyncio.to_thread(self.db.insert_statute, asdict(record))
+                    if result['success']:
+                        return 'created'
+
+                except Exception as e:
+                    print(f"  ❌ Error processing section {i}: {e}")
+
+                return None
+
+        return await asyncio.gather(*(maybe_upsert(i, section) for i, section in enumerate(sections)))
+
 def main():
     print("Oklahoma Constitution PDF Processor")
     print("=" * 50)
@@ -346,12 +520,18 @@ def main():
     elif method == '2':
         text = processor.process_with_pypdf2(chosen_pdf)
     elif method == '3':
-        try:
-            text = processor.process_with_pdfplumber(chosen_pdf)
-        except Exception as e:
-            print(f"pdfplumber failed: {e}")
-            print("Falling back to PyPDF2...")
+        # Probe page 1 with both libraries and run only the better one
+        # over the whole document
+        if processor.sniff_extractor(chosen_pdf) == 'pypdf2':
+            print("Using PyPDF2 (better page 1 extraction)")
             text = processor.process_with_pypdf2(chosen_pdf)
+        else:
+            try:
+                text = processor.process_with_pdfplumber(chosen_pdf)
+            except Exception as e:
+                print(f"pdfplumber failed: {e}")
+                print("Falling back to PyPDF2...")
+                text = processor.process_with_pypdf2(chosen_pdf)
     else:
         print("Invalid choice")
         return
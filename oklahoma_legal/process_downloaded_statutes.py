@@ -4,6 +4,7 @@ Process the downloaded statute HTML files and upload to Pinecone
 Non-interactive version - automatically processes all files
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -30,7 +31,12 @@ try:
     html_files = []
     title_dir = Path('statute_html/title_10')
     if title_dir.exists():
-        html_files = list(title_dir.glob('*.html'))
+        # Single directory scan; the list is handed to the processor below
+        with os.scandir(title_dir) as entries:
+            html_files = sorted(
+                Path(entry.path) for entry in entries
+                if entry.name.endswith('.html') and entry.is_file()
+            )
 
     total_files = len(html_files)
     print(f"Found {total_files} HTML files to process")
@@ -40,7 +46,7 @@ try:
     print()
 
     # Process without confirmation
-    processor.process_all_html_files(start_title=10, end_title=10)
+    processor.process_all_html_files(start_title=10, end_title=10, files=html_files)
 
     print("\n" + "=" * 60)
     print("[SUCCESS] Processing complete!")
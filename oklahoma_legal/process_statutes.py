@@ -15,17 +15,34 @@ Usage:
     python process_statutes.py --title 11 --skip-embeddings  # Skip Pinecone
     python process_statutes.py --title 10 --supabase-only    # Only Supabase
     python process_statutes.py --title 10 --pinecone-only    # Only Pinecone
+    python process_statutes.py --titles 10,11,12             # One process per title
 """
 
 import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from bs4 import BeautifulSoup
+import html as html_lib
 import json
 import re
-from typing import List, Dict
+from itertools import islice
+from typing import Iterator, List, Dict, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    # Falls back to BeautifulSoup + lxml (slower)
+    SELECTOLAX_AVAILABLE = False
 
 # Import configurations
 if os.getenv('PRODUCTION') or os.getenv('RENDER'):
@@ -36,6 +53,12 @@ else:
     except ImportError:
         from config_production import SUPABASE_URL, SUPABASE_KEY
 
+# Optional direct Postgres connection string (bulk COPY instead of PostgREST)
+try:
+    from config import DATABASE_URL
+except ImportError:
+    DATABASE_URL = os.getenv('DATABASE_URL', '')
+
 # Import clients
 try:
     from supabase import create_client, Client
@@ -44,7 +67,262 @@ except ImportError:
     print("Install with: pip install supabase")
     sys.exit(1)
 
-from vector_database_builder import ConstitutionVectorBuilder
+try:
+    import psycopg
+    from psycopg.types.json import Jsonb, set_json_dumps
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+from vector_database_builder import ConstitutionVectorBuilder, EMBEDDING_MODEL
+from embedding_cache import EmbeddingCache
+
+# Parallel Pinecone upserts: vectors per request and connection pool size
+PINECONE_UPSERT_CHUNK = 100
+PINECONE_POOL_THREADS = 30
+
+# Pages larger than this are stream-parsed with lxml iterparse
+LARGE_HTML_BYTES = 1_000_000
+
+# Pages without an <html> tag in their first N chars are treated as empty
+HTML_SNIFF_CHARS = 1024
+
+# Hot-path regexes for parse_statute_html
+_NEWLINES_RE = re.compile(r'\n{3,}')
+_SECTION_RE = re.compile(r'Section\s+(\d+[A-Za-z]?[\-\d\.]*)', re.IGNORECASE)
+
+# Fixed-template extraction (OSCN statute pages)
+_TITLE_TAG_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.S | re.I)
+_H1_TAG_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.S | re.I)
+_MAIN_DIV_RE = re.compile(r'<div[^>]*\bclass=["\'](?:[^"\']*\s)?main(?:\s[^"\']*)?["\'][^>]*>(.*?)</div>', re.S | re.I)
+_CONTENT_DIV_RE = re.compile(r'<div[^>]*\bid=["\']content["\'][^>]*>(.*?)</div>', re.S | re.I)
+_TAG_RE = re.compile(r'</?[A-Za-z][^>]*>')
+# Markup a non-greedy </div> match can't handle - defer to a real parser
+_UNSAFE_INNER_RE = re.compile(r'<(?:div\b|script\b|style\b|!--)', re.I)
+
+# Column order for COPY into the statutes table
+STATUTE_COLUMNS = (
+    'cite_id', 'url', 'title_number', 'title_name', 'chapter_number', 'chapter_name',
+    'article_number', 'article_name', 'section_number', 'section_name', 'page_title',
+    'title_bar', 'citation_format', 'main_text', 'full_json', 'scraper_version'
+)
+
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    """Truncate text to at most max_bytes of UTF-8 (Pinecone's metadata limits are in bytes)"""
+    if len(text) <= max_bytes // 4:
+        # Can't exceed the limit even if every char is 4 bytes
+        return text
+    encoded = text[:max_bytes].encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text[:max_bytes]
+    # 'ignore' drops a multi-byte character cut in half at the end
+    return encoded[:max_bytes].decode('utf-8', 'ignore')
+
+def _text_pieces(fragment: str):
+    """Stripped, non-empty text pieces between tags (like BeautifulSoup's strip=True)"""
+    for piece in _TAG_RE.split(fragment):
+        piece = html_lib.unescape(piece).strip()
+        if piece:
+            yield piece
+
+def _extract_with_regex(html: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract (section_name, text) with precompiled regexes for the fixed
+    statute page template. Returns None when the page doesn't fit the
+    template (no main container, or nested divs/scripts/comments inside
+    it) so the caller can fall back to a full parser.
+    """
+    main_match = _MAIN_DIV_RE.search(html) or _CONTENT_DIV_RE.search(html)
+    if not main_match or _UNSAFE_INNER_RE.search(main_match.group(1)):
+        return None
+
+    title_match = _TITLE_TAG_RE.search(html)
+    section_name = ''.join(_text_pieces(title_match.group(1))) if title_match else "Untitled"
+
+    h1_match = _H1_TAG_RE.search(html)
+    if h1_match:
+        section_name = ''.join(_text_pieces(h1_match.group(1)))
+
+    text_content = '\n'.join(_text_pieces(main_match.group(1)))
+    return section_name, text_content
+
+def _extract_with_selectolax(html: str) -> Tuple[str, str]:
+    """Extract (section_name, text) with selectolax's C (lexbor) parser"""
+    tree = LexborHTMLParser(html)
+    # BeautifulSoup's get_text() skips script/style contents; match that
+    tree.strip_tags(['script', 'style'])
+
+    title_tag = tree.css_first('title')
+    section_name = title_tag.text(strip=True) if title_tag else "Untitled"
+
+    h1_tag = tree.css_first('h1')
+    if h1_tag:
+        section_name = h1_tag.text(strip=True)
+
+    main_content = tree.css_first('div.main') or tree.css_first('div#content')
+    if main_content:
+        # Same result as BeautifulSoup get_text(separator='\n', strip=True):
+        # stripped text nodes, empty ones dropped
+        parts = (node.text(deep=False, strip=True)
+                 for node in main_content.traverse(include_text=True)
+                 if node.tag == '-text')
+        text_content = '\n'.join(part for part in parts if part)
+    else:
+        paragraphs = tree.css('p')
+        text_content = '\n\n'.join([p.text(strip=True) for p in paragraphs])
+
+    return section_name, text_content
+
+def _extract_with_bs4(html: str) -> Tuple[str, str]:
+    """Extract (section_name, text) with BeautifulSoup"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    title_tag = soup.find('title')
+    section_name = title_tag.get_text(strip=True) if title_tag else "Untitled"
+
+    h1_tag = soup.find('h1')
+    if h1_tag:
+        section_name = h1_tag.get_text(strip=True)
+
+    main_content = soup.find('div', class_='main') or soup.find('div', id='content')
+    if main_content:
+        text_content = main_content.get_text(separator='\n', strip=True)
+    else:
+        paragraphs = soup.find_all('p')
+        text_content = '\n\n'.join([p.get_text(strip=True) for p in paragraphs])
+
+    return section_name, text_content
+
+def _iter_element_strings(element):
+    """Text strings under an element in document order, skipping script/style/comments"""
+    if isinstance(element.tag, str) and element.tag not in ('script', 'style'):
+        if element.text:
+            yield element.text
+        for child in element:
+            yield from _iter_element_strings(child)
+            if child.tail:
+                yield child.tail
+
+def _is_main_container(element) -> bool:
+    return 'main' in (element.get('class') or '').split() or element.get('id') == 'content'
+
+def _extract_with_iterparse(html_path: Path) -> Tuple[str, str]:
+    """
+    Extract (section_name, text) from a large HTML file with lxml's iterparse
+
+    Elements are handled as they close and pruned unless they sit inside a
+    possible main-content div, so memory stays bounded instead of holding
+    the whole document tree.
+    """
+    from lxml import etree
+
+    title_text = None
+    h1_text = None
+    main_text = None      # first <div class="main">
+    content_text = None   # first <div id="content">
+    paragraphs = []
+
+    for _, element in etree.iterparse(str(html_path), events=('end',), html=True,
+                                      encoding='utf-8', tag=('title', 'h1', 'div', 'p')):
+        tag = element.tag
+        if tag == 'title' and title_text is None:
+            title_text = ''.join(s.strip() for s in _iter_element_strings(element))
+        elif tag == 'h1' and h1_text is None:
+            h1_text = ''.join(s.strip() for s in _iter_element_strings(element))
+        elif tag == 'p':
+            paragraphs.append(''.join(s.strip() for s in _iter_element_strings(element)))
+        elif tag == 'div':
+            if main_text is None and 'main' in (element.get('class') or '').split():
+                main_text = '\n'.join(s.strip() for s in _iter_element_strings(element) if s.strip())
+            elif content_text is None and element.get('id') == 'content':
+                content_text = '\n'.join(s.strip() for s in _iter_element_strings(element) if s.strip())
+
+        # Prune handled subtrees unless an enclosing div may still need them
+        if not any(_is_main_container(ancestor) for ancestor in element.iterancestors('div')):
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    section_name = title_text if title_text is not None else "Untitled"
+    if h1_text is not None:
+        section_name = h1_text
+
+    if main_text is not None:
+        text_content = main_text
+    elif content_text is not None:
+        text_content = content_text
+    else:
+        text_content = '\n\n'.join(paragraphs)
+
+    return section_name, text_content
+
+def parse_statute_html(html_path: Path, metadata: Dict, title_number: int,
+                       processed_at: Optional[str] = None) -> Dict:
+    """
+    Parse a statute HTML file into a record (module level so worker processes can run it)
+
+    processed_at: shared ISO timestamp for the run; defaults to now
+    """
+
+    # Extract section name and text - stream very large pages instead of
+    # holding the full document and tree in memory
+    if html_path.stat().st_size > LARGE_HTML_BYTES:
+        section_name, text_content = _extract_with_iterparse(html_path)
+    else:
+        raw = html_path.read_bytes()
+
+        # Empty or non-HTML shells (e.g. failed downloads) - skip decoding
+        # and building a tree
+        if b'<html' not in raw[:HTML_SNIFF_CHARS].lower():
+            section_name, text_content = "Untitled", ""
+        else:
+            html = raw.decode('utf-8')
+            extracted = _extract_with_regex(html)
+            if extracted:
+                section_name, text_content = extracted
+            elif SELECTOLAX_AVAILABLE:
+                section_name, text_content = _extract_with_selectolax(html)
+            else:
+                section_name, text_content = _extract_with_bs4(html)
+
+    # Clean text
+    text_content = _NEWLINES_RE.sub('\n\n', text_content).strip()
+
+    # Extract section number
+    section_match = _SECTION_RE.search(section_name)
+    section_number = section_match.group(1) if section_match else ""
+
+    cite_id = metadata.get('cite_id', html_path.stem.replace('cite_', ''))
+
+    return {
+        'cite_id': cite_id,
+        'url': metadata.get('url', ''),
+        'title_number': str(title_number),
+        'section_number': section_number,
+        'section_name': section_name,
+        'text': text_content,
+        'downloaded_at': metadata.get('downloaded_at', ''),
+        'processed_at': processed_at or datetime.now().isoformat()
+    }
+
+def _load_json_file(path: Path):
+    """Load a JSON file (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _parse_statute_file(args: Tuple[Path, int, bool, str]) -> Tuple[Path, Optional[Dict], Optional[str]]:
+    """Worker: load metadata and parse one file; errors are returned, not raised"""
+    html_path, title_number, has_meta, processed_at = args
+    try:
+        metadata = {}
+        if has_meta:
+            metadata = _load_json_file(html_path.with_suffix('.meta.json'))
+
+        return html_path, parse_statute_html(html_path, metadata, title_number, processed_at), None
+    except Exception as e:
+        return html_path, None, str(e)
 
 class UnifiedStatuteProcessor:
     def __init__(self, title_number: int, supabase_only: bool = False, pinecone_only: bool = False):
@@ -62,6 +340,18 @@ class UnifiedStatuteProcessor:
                 if not pinecone_only:
                     sys.exit(1)
 
+        # Direct Postgres connection for bulk loading (falls back to the REST API)
+        self.pg_conn = None
+        if not pinecone_only and PSYCOPG_AVAILABLE and DATABASE_URL:
+            try:
+                self.pg_conn = psycopg.connect(DATABASE_URL)
+                if ORJSON_AVAILABLE:
+                    # Serialize full_json (Jsonb) with orjson on this connection
+                    set_json_dumps(orjson.dumps, self.pg_conn)
+                print("[OK] Connected to Postgres (bulk COPY enabled)")
+            except Exception as e:
+                print(f"[WARNING] Postgres connection failed, using Supabase REST inserts: {e}")
+
         # Initialize Pinecone
         if not supabase_only:
             try:
@@ -72,56 +362,21 @@ class UnifiedStatuteProcessor:
                         sys.exit(1)
 
                 index_name = f"oklahoma-statutes"
-                self.builder.index = self.builder.pinecone_client.Index(index_name)
+                self.builder.index = self.builder.pinecone_client.Index(
+                    index_name, pool_threads=PINECONE_POOL_THREADS
+                )
                 print(f"[OK] Connected to Pinecone index: {index_name}")
             except Exception as e:
                 print(f"[ERROR] Failed to connect to Pinecone: {e}")
                 if not supabase_only:
                     sys.exit(1)
 
-    def parse_html_file(self, html_path: Path, metadata: Dict) -> Dict:
-        """Parse HTML file and extract statute data"""
-
-        with open(html_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, 'html.parser')
+            # Reuse embeddings from previous runs (keyed by content hash)
+            self.embedding_cache = EmbeddingCache(EMBEDDING_MODEL)
 
-        # Extract section name
-        title_tag = soup.find('title')
-        section_name = title_tag.get_text(strip=True) if title_tag else "Untitled"
-
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            section_name = h1_tag.get_text(strip=True)
-
-        # Extract text
-        main_content = soup.find('div', class_='main') or soup.find('div', id='content')
-        if main_content:
-            text_content = main_content.get_text(separator='\n', strip=True)
-        else:
-            paragraphs = soup.find_all('p')
-            text_content = '\n\n'.join([p.get_text(strip=True) for p in paragraphs])
-
-        # Clean text
-        text_content = re.sub(r'\n{3,}', '\n\n', text_content).strip()
-
-        # Extract section number
-        section_match = re.search(r'Section\s+(\d+[A-Za-z]?[\-\d\.]*)', section_name, re.IGNORECASE)
-        section_number = section_match.group(1) if section_match else ""
-
-        cite_id = metadata.get('cite_id', html_path.stem.replace('cite_', ''))
-
-        return {
-            'cite_id': cite_id,
-            'url': metadata.get('url', ''),
-            'title_number': str(self.title_number),
-            'section_number': section_number,
-            'section_name': section_name,
-            'text': text_content,
-            'downloaded_at': metadata.get('downloaded_at', ''),
-            'processed_at': datetime.now().isoformat()
-        }
+    def parse_html_file(self, html_path: Path, metadata: Dict, processed_at: Optional[str] = None) -> Dict:
+        """Parse HTML file and extract statute data"""
+        return parse_statute_html(html_path, metadata, self.title_number, processed_at)
 
     def upload_to_supabase(self, records: List[Dict]) -> bool:
         """Upload batch to Supabase"""
@@ -161,12 +416,48 @@ class UnifiedStatuteProcessor:
                 }
                 supabase_records.append(supabase_record)
 
-            result = self.supabase.table('statutes').insert(supabase_records).execute()
+            if self.pg_conn is not None:
+                self.copy_statutes(supabase_records)
+            else:
+                result = self.supabase.table('statutes').insert(supabase_records).execute()
             return True
         except Exception as e:
             print(f"[ERROR] Supabase upload failed: {e}")
             return False
 
+    def copy_statutes(self, supabase_records: List[Dict]):
+        """Bulk load statute rows with a single Postgres COPY"""
+        columns = ', '.join(STATUTE_COLUMNS)
+        try:
+            with self.pg_conn.cursor() as cur:
+                with cur.copy(f"COPY statutes ({columns}) FROM STDIN") as copy:
+                    for record in supabase_records:
+                        copy.write_row([
+                            Jsonb(record[column]) if column == 'full_json' else record[column]
+                            for column in STATUTE_COLUMNS
+                        ])
+            self.pg_conn.commit()
+        except Exception:
+            self.pg_conn.rollback()
+            raise
+
+    def iter_vectors(self, records: List[Dict], embeddings: List[List[float]]) -> Iterator[Dict]:
+        """Yield Pinecone vectors for records (generator - nothing is materialized up front)"""
+        for record, embedding in zip(records, embeddings):
+            yield {
+                'id': f"statute_{record['cite_id']}",
+                # Cached vectors may be float32 arrays; convert only here
+                'values': embedding.tolist() if hasattr(embedding, 'tolist') else embedding,
+                'metadata': {
+                    'cite_id': record['cite_id'],
+                    'title_number': self.title_number,
+                    'section_name': _truncate_utf8(record['section_name'], 500),
+                    'section_number': record['section_number'],
+                    'text': _truncate_utf8(record['text'], 10000),
+                    'type': 'statute'
+                }
+            }
+
     def upload_to_pinecone(self, records: List[Dict]) -> bool:
         """Upload batch to Pinecone with embeddings"""
         if self.supabase_only:
@@ -175,38 +466,43 @@ class UnifiedStatuteProcessor:
         try:
             # Create embeddings
             texts = [f"{r['section_name']}\n\n{r['text']}" for r in records]
-            embeddings = self.builder.create_embeddings(texts)
+            embeddings = self.embedding_cache.embed(texts, self.builder.create_embeddings)
 
             if not embeddings:
                 print(f"[ERROR] Failed to create embeddings")
                 return False
 
-            # Prepare vectors for Pinecone
-            vectors = []
-            for record, embedding in zip(records, embeddings):
-                vector = {
-                    'id': f"statute_{record['cite_id']}",
-                    'values': embedding,
-                    'metadata': {
-                        'cite_id': record['cite_id'],
-                        'title_number': self.title_number,
-                        'section_name': record['section_name'][:500],
-                        'section_number': record['section_number'],
-                        'text': record['text'][:10000],
-                        'type': 'statute'
-                    }
-                }
-                vectors.append(vector)
-
-            # Upload to Pinecone
-            self.builder.index.upsert(vectors=vectors)
+            # Upload to Pinecone - vectors are built lazily and sent in
+            # chunks, in parallel over the index's thread pool
+            vectors = self.iter_vectors(records, embeddings)
+            async_results = []
+            while True:
+                chunk = list(islice(vectors, PINECONE_UPSERT_CHUNK))
+                if not chunk:
+                    break
+                async_results.append(self.builder.index.upsert(vectors=chunk, async_req=True))
+
+            for async_result in async_results:
+                async_result.get()
             return True
         except Exception as e:
             print(f"[ERROR] Pinecone upload failed: {e}")
             return False
 
-    def process_title(self, batch_size: int = 50):
-        """Process all HTML files for a title"""
+    def upload_batch(self, records: List[Dict]) -> Tuple[bool, bool]:
+        """Upload a batch to Supabase and Pinecone concurrently (both are network bound)"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            supabase_future = executor.submit(self.upload_to_supabase, records)
+            pinecone_future = executor.submit(self.upload_to_pinecone, records)
+            return supabase_future.result(), pinecone_future.result()
+
+    def process_title(self, batch_size: int = 50, workers: Optional[int] = None):
+        """
+        Process all HTML files for a title
+
+        HTML parsing (CPU bound) runs in a process pool that keeps parsing
+        ahead while this thread uploads finished batches (network bound).
+        """
 
         html_dir = Path(f'statute_html/title_{self.title_number}')
 
@@ -214,7 +510,18 @@ class UnifiedStatuteProcessor:
             print(f"[ERROR] Directory not found: {html_dir}")
             return
 
-        html_files = list(html_dir.glob('*.html'))
+        # One scandir pass finds the HTML files and which have a .meta.json,
+        # so workers don't stat for metadata per file
+        html_names = []
+        meta_names = set()
+        with os.scandir(html_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.meta.json'):
+                    meta_names.add(entry.name)
+                elif entry.name.endswith('.html'):
+                    html_names.append(entry.name)
+
+        html_files = [html_dir / name for name in html_names]
         print(f"\nFound {len(html_files)} HTML files to process")
         print()
 
@@ -222,23 +529,32 @@ class UnifiedStatuteProcessor:
         failure_count = 0
         batch = []
 
-        for i, html_path in enumerate(html_files, 1):
-            try:
-                # Load metadata
-                meta_path = html_path.with_suffix('.meta.json')
-                metadata = {}
-                if meta_path.exists():
-                    with open(meta_path, 'r') as f:
-                        metadata = json.load(f)
-
-                # Parse HTML
-                record = self.parse_html_file(html_path, metadata)
+        # One timestamp for the run instead of a clock read per file
+        processed_at = datetime.now().isoformat()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = executor.map(
+                _parse_statute_file,
+                [(html_path, self.title_number, f"{html_path.stem}.meta.json" in meta_names, processed_at)
+                 for html_path in html_files],
+                chunksize=16
+            )
+
+            for i, (html_path, record, error) in enumerate(parsed, 1):
+                if error:
+                    print(f"[ERROR] Failed to process {html_path.name}: {error}")
+                    failure_count += 1
+                    continue
+
                 batch.append(record)
 
                 # Upload batch when full
                 if len(batch) >= batch_size:
-                    supabase_ok = self.upload_to_supabase(batch)
-                    pinecone_ok = self.upload_to_pinecone(batch)
+                    try:
+                        supabase_ok, pinecone_ok = self.upload_batch(batch)
+                    except Exception as e:
+                        print(f"[ERROR] Failed to upload batch: {e}")
+                        supabase_ok = pinecone_ok = False
 
                     if supabase_ok or pinecone_ok:
                         success_count += len(batch)
@@ -255,14 +571,9 @@ class UnifiedStatuteProcessor:
 
                     batch = []
 
-            except Exception as e:
-                print(f"[ERROR] Failed to process {html_path.name}: {e}")
-                failure_count += 1
-
         # Upload remaining batch
         if batch:
-            supabase_ok = self.upload_to_supabase(batch)
-            pinecone_ok = self.upload_to_pinecone(batch)
+            supabase_ok, pinecone_ok = self.upload_batch(batch)
 
             if supabase_ok or pinecone_ok:
                 success_count += len(batch)
@@ -284,12 +595,25 @@ class UnifiedStatuteProcessor:
         print(f"Failed: {failure_count}")
         print("=" * 60)
 
+def _run_title(title_number: int, supabase_only: bool, pinecone_only: bool,
+               batch_size: int, workers: Optional[int]):
+    """Process one title with its own clients (entry point for --titles worker processes)"""
+    processor = UnifiedStatuteProcessor(
+        title_number=title_number,
+        supabase_only=supabase_only,
+        pinecone_only=pinecone_only
+    )
+    processor.process_title(batch_size=batch_size, workers=workers)
+
 def main():
     parser = argparse.ArgumentParser(description='Process statute HTML files to Supabase and Pinecone')
-    parser.add_argument('--title', type=int, required=True, help='Title number (e.g., 10)')
+    title_group = parser.add_mutually_exclusive_group(required=True)
+    title_group.add_argument('--title', type=int, help='Title number (e.g., 10)')
+    title_group.add_argument('--titles', type=str, help='Comma-separated title numbers, processed in parallel (e.g., 10,11,12)')
     parser.add_argument('--supabase-only', action='store_true', help='Only upload to Supabase')
     parser.add_argument('--pinecone-only', action='store_true', help='Only upload to Pinecone')
     parser.add_argument('--batch-size', type=int, default=50, help='Batch size for uploads')
+    parser.add_argument('--workers', type=int, default=None, help='HTML parser processes per title (default: CPU count / titles)')
 
     args = parser.parse_args()
 
@@ -297,8 +621,17 @@ def main():
         print("[ERROR] Cannot specify both --supabase-only and --pinecone-only")
         sys.exit(1)
 
+    if args.titles:
+        try:
+            titles = [int(t) for t in args.titles.split(',') if t.strip()]
+        except ValueError:
+            print(f"[ERROR] Invalid --titles value: {args.titles}")
+            sys.exit(1)
+    else:
+        titles = [args.title]
+
     print("=" * 60)
-    print(f"Processing Title {args.title} Statutes")
+    print(f"Processing Title {', '.join(map(str, titles))} Statutes")
     print("=" * 60)
 
     targets = []
@@ -311,13 +644,24 @@ def main():
     print("=" * 60)
     print()
 
-    processor = UnifiedStatuteProcessor(
-        title_number=args.title,
-        supabase_only=args.supabase_only,
-        pinecone_only=args.pinecone_only
-    )
-
-    processor.process_title(batch_size=args.batch_size)
+    if len(titles) == 1:
+        _run_title(titles[0], args.supabase_only, args.pinecone_only, args.batch_size, args.workers)
+        return
+
+    # One process per title, each with its own Supabase/Pinecone clients;
+    # split the CPUs between the titles' parser pools
+    workers = args.workers or max(1, (os.cpu_count() or 1) // len(titles))
+    with ProcessPoolExecutor(max_workers=len(titles)) as executor:
+        futures = {
+            executor.submit(_run_title, title, args.supabase_only, args.pinecone_only,
+                            args.batch_size, workers): title
+            for title in titles
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except BaseException as e:
+                print(f"[ERROR] Title {futures[future]} failed: {e!r}")
 
 if __name__ == "__main__":
     main()
@@ -3,14 +3,41 @@
 Quick test of semantic search on Oklahoma Constitution
 """
 
-from typing import List, Dict
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from pinecone_config import *
 from vector_database_builder import ConstitutionVectorBuilder
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # Semantic cache is skipped without numpy
+    NUMPY_AVAILABLE = False
+
+# Reuse results of an earlier query whose embedding is this similar (cosine)
+SEMANTIC_CACHE_THRESHOLD = 0.98
+SEMANTIC_CACHE_SIZE = 256
+
 class QuickSearchTest:
     def __init__(self):
         self.builder = ConstitutionVectorBuilder()
         self.setup_complete = False
+        # Per-instance memo of query -> embedding (failures raise and aren't cached)
+        self.embed_query = lru_cache(maxsize=1024)(self._create_query_embedding)
+        # (unit query vector, top_k, results), oldest evicted first
+        self.semantic_cache = deque(maxlen=SEMANTIC_CACHE_SIZE)
+        self.semantic_cache_lock = threading.Lock()  # run_tests queries concurrently
+
+    def _create_query_embedding(self, query: str) -> Tuple[float, ...]:
+        """Embed a single query; raises ValueError on failure"""
+        query_embedding = self.builder.create_embeddings([query])
+        if not query_embedding:
+            raise ValueError("Failed to create query embedding")
+        return tuple(query_embedding[0])
 
     def setup_search(self):
         """Initialize search capabilities"""
@@ -38,6 +65,22 @@ class QuickSearchTest:
             print(f"[ERROR] Error connecting to index: {e}")
             return False
 
+    def semantic_cache_lookup(self, unit_vector, top_k: int) -> Optional[List[Dict]]:
+        """Return cached results for a near-duplicate query, if any"""
+        with self.semantic_cache_lock:
+            entries = list(self.semantic_cache)
+        if not entries:
+            return None
+
+        similarities = np.stack([entry[0] for entry in entries]) @ unit_vector
+        for i in np.argsort(-similarities):
+            if similarities[i] <= SEMANTIC_CACHE_THRESHOLD:
+                break
+            _, cached_top_k, cached_results = entries[i]
+            if cached_top_k >= top_k:
+                return cached_results[:top_k]
+        return None
+
     def search_constitution(self, query: str, top_k: int = 5) -> List[Dict]:
         """Perform semantic search on the constitution"""
 
@@ -48,16 +91,28 @@ class QuickSearchTest:
         try:
             print(f"\nSearching for: '{query}'")
 
-            # Create embedding for the query
-            query_embedding = self.builder.create_embeddings([query])
-
-            if not query_embedding:
+            # Create embedding for the query (cached for repeated queries)
+            try:
+                query_embedding = self.embed_query(query)
+            except ValueError:
                 print("[ERROR] Failed to create query embedding")
                 return []
 
+            # Near-duplicate of an earlier query? Skip the Pinecone round trip
+            unit_vector = None
+            if NUMPY_AVAILABLE:
+                unit_vector = np.asarray(query_embedding, dtype=np.float32)
+                norm = np.linalg.norm(unit_vector)
+                if norm:
+                    unit_vector /= norm
+                cached = self.semantic_cache_lookup(unit_vector, top_k)
+                if cached is not None:
+                    print("  (semantic cache hit)")
+                    return cached
+
             # Search Pinecone
             search_results = self.builder.index.query(
-                vector=query_embedding[0],
+                vector=list(query_embedding),
                 top_k=top_k,
                 include_metadata=True
             )
@@ -75,6 +130,10 @@ class QuickSearchTest:
                 }
                 results.append(result)
 
+            if unit_vector is not None:
+                with self.semantic_cache_lock:
+                    self.semantic_cache.append((unit_vector, top_k, results))
+
             return results
 
         except Exception as e:
@@ -99,8 +158,13 @@ class QuickSearchTest:
             "due process of law"
         ]
 
-        for query in test_queries:
-            results = self.search_constitution(query, top_k=3)
+        # Run all queries concurrently (each is an embedding + Pinecone round trip),
+        # then print in order
+        with ThreadPoolExecutor(max_workers=len(test_queries)) as executor:
+            all_results = list(executor.map(lambda q: self.search_constitution(q, top_k=3), test_queries))
+
+        for query, results in zip(test_queries, all_results):
+            print(f"\nResults for: '{query}'")
 
             if results:
                 print(f"\nTop {len(results)} results:")
@@ -4,104 +4,320 @@ RAG (Retrieval-Augmented Generation) for Oklahoma Constitution
 Combines vector search with GPT-4 to answer questions in natural language
 """
 
+import asyncio
+import heapq
+import logging
 import os
-from typing import List, Dict
-from vector_database_builder import ConstitutionVectorBuilder
-from supabase import create_client
-import openai
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Iterator, Optional, Tuple
+from response_cache import ResponseCache
+
+# openai, supabase and vector_database_builder (-> pinecone) are imported where
+# they're first used, so importing this module stays cheap
 
 # Import configurations - use environment variables in production
 if os.getenv('PRODUCTION') or os.getenv('RENDER'):
-    from config_production import OPENAI_API_KEY, SUPABASE_URL, SUPABASE_KEY
+    from config_production import OPENAI_API_KEY, SUPABASE_URL, SUPABASE_KEY, VECTOR_DIMENSION
 else:
     try:
-        from pinecone_config import OPENAI_API_KEY
+        from pinecone_config import OPENAI_API_KEY, VECTOR_DIMENSION
         from config import SUPABASE_URL, SUPABASE_KEY
     except ImportError:
-        from config_production import OPENAI_API_KEY, SUPABASE_URL, SUPABASE_KEY
+        from config_production import OPENAI_API_KEY, SUPABASE_URL, SUPABASE_KEY, VECTOR_DIMENSION
+
+# Per-request detail is logged at DEBUG so it's skipped at the production INFO level
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # Semantic cache is skipped without numpy (exact repeats still reuse embeddings)
+    NUMPY_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    # History is budgeted with a ~4 characters/token estimate instead
+    TIKTOKEN_AVAILABLE = False
+
+# Reuse search results of an earlier question whose embedding is this similar (cosine)
+SEMANTIC_CACHE_THRESHOLD = 0.97
+SEMANTIC_CACHE_SIZE = 512
+
+# Source texts are skipped when the best match scores below SKIP_TEXT_SCORE, and
+# only the top LOW_RELEVANCE_TEXTS are fetched below LOW_RELEVANCE_SCORE (where
+# generate_answer switches to its general-knowledge prompt)
+SKIP_TEXT_SCORE = 0.3
+LOW_RELEVANCE_SCORE = 0.5
+LOW_RELEVANCE_TEXTS = 3
+
+# Truncated source texts kept in memory, keyed by (table, cite_id, max_length)
+TEXT_CACHE_SIZE = 4096
+
+# Answer model when none is requested; harder questions escalate to the larger model
+DEFAULT_MODEL = "gpt-4o-mini"
+ESCALATION_MODEL = "gpt-4o"
+ESCALATE_QUESTION_LENGTH = 400  # characters
+ESCALATE_MAX_SCORE = 0.5  # best source below this = low-relevance prompt
+ESCALATE_HISTORY_MESSAGES = 6
+
+# Context window per model, for budgeting conversation history
+MODEL_CONTEXT_TOKENS = {
+    'gpt-4': 8192,
+    'gpt-3.5-turbo': 16385,
+    'gpt-4-turbo-preview': 128000,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+ANSWER_MAX_TOKENS = 500  # Reduced from 1000 to ensure concise responses
+MESSAGE_OVERHEAD_TOKENS = 4  # Role/formatting tokens the API adds per message
+CONTEXT_SLACK_TOKENS = 100
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """tiktoken encoding for a model (cl100k_base for models tiktoken doesn't know)"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens text uses for model (estimated without tiktoken)"""
+    if TIKTOKEN_AVAILABLE:
+        return len(get_encoding(model).encode(text))
+    return len(text) // 4 + 1
+
+# Concurrent index queries per search; also the Pinecone per-index thread pool size
+QUERY_CONCURRENCY = 3
+
+# Throwaway query vector used to open index connections (cosine needs a non-zero vector)
+PREWARM_VECTOR = [1.0] + [0.0] * (VECTOR_DIMENSION - 1)
 
 class ConstitutionRAG:
+    # Shared by all instances - the three index queries are I/O-bound and run
+    # concurrently (threads start lazily, so this is safe before a fork)
+    query_executor = ThreadPoolExecutor(max_workers=QUERY_CONCURRENCY)
+    # The two batched Supabase text fetches (statutes, oklahoma_cases)
+    fetch_executor = ThreadPoolExecutor(max_workers=2)
+
+    # Location labels for case law matches
+    COURT_NAMES = {
+        'supreme_court': 'Oklahoma Supreme Court',
+        'criminal_appeals': 'Oklahoma Court of Criminal Appeals',
+        'civil_appeals': 'Oklahoma Court of Civil Appeals'
+    }
+
     def __init__(self):
+        import openai
+        from vector_database_builder import ConstitutionVectorBuilder
+
         self.builder = ConstitutionVectorBuilder()
         self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.async_openai_client = None  # Created on first agenerate_answer, inside the event loop
         self.supabase = None
         self.constitution_index = None
         self.statutes_index = None
         self.case_law_index = None
         self.ready = False
+        # Per-instance memo of normalized query -> embedding (failures raise and aren't cached)
+        self.embed_query = lru_cache(maxsize=1024)(self._create_query_embedding)
+        # Semantic cache: row i of cache_embeddings is the unit query vector for
+        # cache_results[i] = (top_k, results); slots are reused oldest-first
+        self.cache_embeddings = None
+        self.cache_results = []
+        self.cache_next = 0
+        self.cache_lock = threading.Lock()
+        # Truncated source texts (LRU) - the corpus only changes on re-ingestion
+        self.text_cache = OrderedDict()
+        self.text_cache_lock = threading.Lock()
+        # Generated answers, reused for identical question/sources/model/history
+        self.response_cache = ResponseCache()
+
+    def _create_query_embedding(self, query: str) -> Tuple[float, ...]:
+        """Embed a single query; raises ValueError on failure"""
+        query_embedding = self.builder.create_embeddings([query])
+        if not query_embedding:
+            raise ValueError("Failed to create query embedding")
+        vector = query_embedding[0]
+        if hasattr(vector, 'tolist'):
+            # numpy array -> plain floats, so the query JSON encoder never sees numpy scalars
+            vector = vector.tolist()
+        return tuple(vector)
+
+    def semantic_cache_lookup(self, unit_vector, top_k: int) -> Optional[List[Dict]]:
+        """Return cached results for a near-duplicate query, if any"""
+        with self.cache_lock:
+            if not self.cache_results:
+                return None
+            # One matrix-vector product against every cached query
+            similarities = self.cache_embeddings[:len(self.cache_results)] @ unit_vector
+            for i in np.argsort(-similarities):
+                if similarities[i] < SEMANTIC_CACHE_THRESHOLD:
+                    break
+                cached_top_k, cached_results = self.cache_results[i]
+                # Results are sorted by score, so a larger top_k holds the smaller one as a prefix
+                if cached_top_k >= top_k:
+                    return cached_results[:top_k]
+        return None
+
+    def semantic_cache_store(self, unit_vector, top_k: int, results: List[Dict]):
+        """Remember results for a query, evicting the oldest entry when full"""
+        with self.cache_lock:
+            if self.cache_embeddings is None:
+                self.cache_embeddings = np.zeros((SEMANTIC_CACHE_SIZE, len(unit_vector)), dtype=np.float32)
+            slot = self.cache_next
+            self.cache_embeddings[slot] = unit_vector
+            if slot < len(self.cache_results):
+                self.cache_results[slot] = (top_k, results)
+            else:
+                self.cache_results.append((top_k, results))
+            self.cache_next = (slot + 1) % SEMANTIC_CACHE_SIZE
 
     def initialize(self):
         """Initialize the RAG system"""
         if self.ready:
             return True
 
-        print("Initializing RAG system...")
+        logger.info("Initializing RAG system...")
 
         # Setup clients
         if not self.builder.setup_clients():
-            print("[ERROR] Failed to setup clients")
+            logger.error("Failed to setup clients")
             return False
 
         # Connect to Supabase
         try:
+            from supabase import create_client
             self.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-            print("[OK] Connected to Supabase")
+            logger.info("Connected to Supabase")
         except Exception as e:
-            print(f"[ERROR] Failed to connect to Supabase: {e}")
+            logger.error("Failed to connect to Supabase: %s", e)
             return False
 
-        # Connect to all indexes
+        # Connect to all indexes (handle construction is local, no round trip).
+        # The handles live as long as this instance, so their HTTP connection
+        # pools are reused by every request
         try:
-            # Constitution index
-            self.constitution_index = self.builder.pinecone_client.Index("oklahoma-constitution")
-            const_stats = self.constitution_index.describe_index_stats()
-            print(f"[OK] Connected to Constitution index with {const_stats.total_vector_count} vectors")
-
-            # Statutes index
-            self.statutes_index = self.builder.pinecone_client.Index("oklahoma-statutes")
-            stat_stats = self.statutes_index.describe_index_stats()
-            print(f"[OK] Connected to Statutes index with {stat_stats.total_vector_count} vectors")
-
-            # Case Law index
-            self.case_law_index = self.builder.pinecone_client.Index("oklahoma-case-law")
-            case_stats = self.case_law_index.describe_index_stats()
-            print(f"[OK] Connected to Case Law index with {case_stats.total_vector_count} vectors")
+            pinecone_client = self.builder.pinecone_client
+            self.constitution_index = pinecone_client.Index("oklahoma-constitution", pool_threads=QUERY_CONCURRENCY)
+            self.statutes_index = pinecone_client.Index("oklahoma-statutes", pool_threads=QUERY_CONCURRENCY)
+            self.case_law_index = pinecone_client.Index("oklahoma-case-law", pool_threads=QUERY_CONCURRENCY)
+
+            indexes = [
+                ('Constitution', self.constitution_index),
+                ('Statutes', self.statutes_index),
+                ('Case Law', self.case_law_index),
+            ]
+            if os.getenv('DEBUG_STATS'):
+                # Vector counts cost a round trip per index - only on request
+                for label, index in indexes:
+                    stats = index.describe_index_stats()
+                    logger.info("Connected to %s index with %s vectors", label, stats.total_vector_count)
+            else:
+                logger.info("Connected to Constitution, Statutes and Case Law indexes")
+
+            # Warm up the HTTPS connections in the background so the first
+            # real question doesn't pay for the TLS handshakes
+            for label, index in indexes:
+                self.query_executor.submit(self.prewarm_index, label, index)
 
             self.ready = True
             return True
 
         except Exception as e:
-            print(f"[ERROR] Failed to connect to indexes: {e}")
+            logger.error("Failed to connect to indexes: %s", e)
             return False
 
-    def get_document_text(self, cite_id: str, max_length: int = 1500) -> str:
-        """Fetch document text from Supabase and truncate for context window"""
+    @staticmethod
+    def prewarm_index(label: str, index):
+        """Issue a throwaway top_k=1 query to open the index connection"""
+        try:
+            index.query(vector=PREWARM_VECTOR, top_k=1)
+        except Exception as e:
+            logger.warning("Failed to prewarm %s index: %s", label, e)
+
+    @staticmethod
+    def truncate_for_context(text: str, max_length: int) -> str:
+        """Truncate text to fit in the context window, at a sentence boundary if possible"""
+        if len(text) > max_length:
+            # Only a period in the last 30% counts, so scan just that window
+            # (str.rfind with bounds - no intermediate slice, no full scan)
+            last_period = text.rfind('.', int(max_length * 0.7) + 1, max_length)
+            if last_period != -1:
+                truncated = text[:last_period + 1]
+            else:
+                truncated = text[:max_length]
+            return truncated + "\n[Text truncated for length...]"
+        return text
+
+    def cached_texts(self, table: str, cite_ids: List[str], max_length: int, fetch) -> Dict[str, str]:
+        """Return truncated texts from the in-memory cache, fetching only the misses"""
+        texts = {}
+        missing = []
+        with self.text_cache_lock:
+            for cite_id in cite_ids:
+                key = (table, cite_id, max_length)
+                if key in self.text_cache:
+                    self.text_cache.move_to_end(key)
+                    texts[cite_id] = self.text_cache[key]
+                else:
+                    missing.append(cite_id)
+
+        if missing:
+            fetched = fetch(missing, max_length)
+            with self.text_cache_lock:
+                for cite_id, text in fetched.items():
+                    self.text_cache[(table, cite_id, max_length)] = text
+                while len(self.text_cache) > TEXT_CACHE_SIZE:
+                    self.text_cache.popitem(last=False)
+            texts.update(fetched)
+
+        return texts
+
+    def get_documents_texts(self, cite_ids: List[str], max_length: int = 1500) -> Dict[str, str]:
+        """Document texts keyed by cite_id (cached; misses fetched in one request)"""
+        return self.cached_texts('statutes', cite_ids, max_length, self._fetch_documents_texts)
+
+    def get_cases_texts(self, cite_ids: List[str], max_length: int = 2000) -> Dict[str, str]:
+        """Case law texts keyed by cite_id (cached; misses fetched in one request)"""
+        return self.cached_texts('oklahoma_cases', cite_ids, max_length, self._fetch_cases_texts)
+
+    def _fetch_documents_texts(self, cite_ids: List[str], max_length: int) -> Dict[str, str]:
+        """Fetch document texts from Supabase in a single request, keyed by cite_id"""
+        if not cite_ids:
+            return {}
         try:
-            result = self.supabase.table('statutes').select('main_text').eq('cite_id', cite_id).limit(1).execute()
-            if result.data and len(result.data) > 0:
-                text = result.data[0].get('main_text', '')
-                # Truncate if too long to fit in context window
-                if len(text) > max_length:
-                    # Try to truncate at a sentence boundary
-                    truncated = text[:max_length]
-                    last_period = truncated.rfind('.')
-                    if last_period > max_length * 0.7:  # If we can find a period in the last 30%
-                        truncated = truncated[:last_period + 1]
-                    return truncated + "\n[Text truncated for length...]"
-                return text
-            return ''
+            result = self.supabase.table('statutes').select('cite_id, main_text').in_('cite_id', cite_ids).execute()
+            texts = {}
+            for row in result.data or []:
+                if row['cite_id'] not in texts:
+                    texts[row['cite_id']] = self.truncate_for_context(row.get('main_text') or '', max_length)
+            return texts
         except Exception as e:
-            print(f"[ERROR] Failed to fetch text for {cite_id}: {e}")
-            return ''
+            logger.error("Failed to fetch text for %d documents: %s", len(cite_ids), e)
+            return {}
 
-    def get_case_text(self, cite_id: str, max_length: int = 2000) -> str:
-        """Fetch case law text from Supabase and truncate for context window"""
+    def _fetch_cases_texts(self, cite_ids: List[str], max_length: int) -> Dict[str, str]:
+        """Fetch case law texts from Supabase in a single request, keyed by cite_id"""
+        if not cite_ids:
+            return {}
         try:
-            result = self.supabase.table('oklahoma_cases').select('opinion_text, syllabus').eq('cite_id', cite_id).limit(1).execute()
-            if result.data and len(result.data) > 0:
+            result = self.supabase.table('oklahoma_cases').select('cite_id, opinion_text, syllabus').in_('cite_id', cite_ids).execute()
+            texts = {}
+            for row in result.data or []:
+                if row['cite_id'] in texts:
+                    continue
+
                 # Combine syllabus and opinion text
-                syllabus = result.data[0].get('syllabus', '')
-                opinion = result.data[0].get('opinion_text', '')
+                syllabus = row.get('syllabus', '')
+                opinion = row.get('opinion_text', '')
 
                 # Syllabus first (summary), then opinion
                 text = ""
@@ -110,164 +326,265 @@ class ConstitutionRAG:
                 if opinion:
                     text += "OPINION:\n" + opinion
 
-                # Truncate if too long
-                if len(text) > max_length:
-                    truncated = text[:max_length]
-                    last_period = truncated.rfind('.')
-                    if last_period > max_length * 0.7:
-                        truncated = truncated[:last_period + 1]
-                    return truncated + "\n[Text truncated for length...]"
-                return text
-            return ''
+                texts[row['cite_id']] = self.truncate_for_context(text, max_length)
+            return texts
         except Exception as e:
-            print(f"[ERROR] Failed to fetch case text for {cite_id}: {e}")
-            return ''
-
-    def search_relevant_sections(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search for relevant sections from both Constitution and Statutes"""
-        if not self.ready:
-            if not self.initialize():
-                return []
-
-        try:
-            # Create embedding
-            query_embedding = self.builder.create_embeddings([query])
-            if not query_embedding:
-                return []
-
-            results = []
+            logger.error("Failed to fetch case text for %d cases: %s", len(cite_ids), e)
+            return {}
 
-            # Search Constitution index
-            print(f"[DEBUG] RAG: Searching Constitution index for: '{query}' (top_k={top_k})")
-            const_results = self.constitution_index.query(
-                vector=query_embedding[0],
-                top_k=top_k,
-                include_metadata=True
-            )
-            print(f"[DEBUG] RAG: Constitution search returned {len(const_results.matches)} results")
+    def get_document_text(self, cite_id: str, max_length: int = 1500) -> str:
+        """Fetch document text from Supabase and truncate for context window"""
+        return self.get_documents_texts([cite_id], max_length).get(cite_id, '')
 
-            for match in const_results.matches:
-                cite_id = match.metadata.get('cite_id', 'N/A')
-                article_num = match.metadata.get('article_number', '')
-                section_num = match.metadata.get('section_number', '')
+    def get_case_text(self, cite_id: str, max_length: int = 2000) -> str:
+        """Fetch case law text from Supabase and truncate for context window"""
+        return self.get_cases_texts([cite_id], max_length).get(cite_id, '')
+
+    def fill_texts(self, results: List[Dict]):
+        """Set 'text' on results with one batched request per table, run concurrently"""
+        # Constitution and Statutes share the statutes table
+        document_ids = list(dict.fromkeys(r['cite_id'] for r in results if r['document_type'] != 'case_law'))
+        case_ids = list(dict.fromkeys(r['cite_id'] for r in results if r['document_type'] == 'case_law'))
+        documents_future = self.fetch_executor.submit(self.get_documents_texts, document_ids)
+        cases_future = self.fetch_executor.submit(self.get_cases_texts, case_ids)
+        document_texts = documents_future.result()
+        case_texts = cases_future.result()
+
+        for r in results:
+            texts = case_texts if r['document_type'] == 'case_law' else document_texts
+            r['text'] = texts.get(r['cite_id'], '')
+
+    def prepare_query(self, query: str, top_k: int):
+        """
+        Embed a query and check the semantic cache
 
-                # Build location label
+        Returns:
+            (query vector as a plain list, unit vector or None, cached results or None);
+            raises ValueError if the embedding fails
+        """
+        # Create embedding (cached for repeated queries)
+        query_embedding = self.embed_query(' '.join(query.split()))
+
+        # Near-duplicate of an earlier question? Skip the index queries and text fetches
+        unit_vector = None
+        if NUMPY_AVAILABLE:
+            unit_vector = np.asarray(query_embedding, dtype=np.float32)
+            norm = np.linalg.norm(unit_vector)
+            if norm:
+                unit_vector /= norm
+            cached = self.semantic_cache_lookup(unit_vector, top_k)
+            if cached is not None:
+                logger.debug("RAG: Semantic cache hit for: '%s'", query)
+                return None, unit_vector, cached
+
+        # One plain list shared by all three index queries
+        return list(query_embedding), unit_vector, None
+
+    def index_searches(self) -> Dict:
+        """doc_type -> (label, index) for the three indexes"""
+        return {
+            'constitution': ('Constitution', self.constitution_index),
+            'statute': ('Statutes', self.statutes_index),
+            'case_law': ('Case Law', self.case_law_index),
+        }
+
+    def build_results(self, matches: Dict) -> List[Dict]:
+        """Turn the Pinecone matches per doc_type into result dicts (text filled in later)"""
+        results = []
+
+        for match in matches['constitution']:
+            md = match.metadata
+            cite_id = md.get('cite_id', 'N/A')
+            article_num = md.get('article_number', '')
+            section_num = md.get('section_number', '')
+
+            # Build location label
+            if article_num and section_num:
+                location = f"Oklahoma Constitution - Article {article_num}, Section {section_num}"
+            elif article_num:
+                location = f"Oklahoma Constitution - Article {article_num}"
+            else:
                 location = "Oklahoma Constitution"
-                if article_num:
-                    location += f" - Article {article_num}"
-                    if section_num:
-                        location += f", Section {section_num}"
 
-                result = {
-                    'score': match.score,
-                    'cite_id': cite_id,
-                    'section_name': match.metadata.get('page_title', 'Untitled'),
-                    'location': location,
-                    'document_type': 'constitution',
-                    'article_number': article_num,
-                    'section_number': section_num,
-                    'text': self.get_document_text(cite_id),
-                }
-                results.append(result)
-
-            # Search Statutes index
-            print(f"[DEBUG] RAG: Searching Statutes index for: '{query}' (top_k={top_k})")
-            stat_results = self.statutes_index.query(
-                vector=query_embedding[0],
-                top_k=top_k,
-                include_metadata=True
-            )
-            print(f"[DEBUG] RAG: Statutes search returned {len(stat_results.matches)} results")
+            result = {
+                'score': match.score,
+                'cite_id': cite_id,
+                'section_name': md.get('page_title', 'Untitled'),
+                'location': location,
+                'document_type': 'constitution',
+                'article_number': article_num,
+                'section_number': section_num,
+                'text': '',
+            }
+            results.append(result)
+
+        for match in matches['statute']:
+            md = match.metadata
+            cite_id = md.get('cite_id', 'N/A')
+            title_num = md.get('title_number', '')
+            section_num = md.get('section_number', '')
+
+            # Build location label
+            if title_num and section_num:
+                location = f"Oklahoma Statutes - Title {title_num}, Section {section_num}"
+            elif title_num:
+                location = f"Oklahoma Statutes - Title {title_num}"
+            else:
+                location = "Oklahoma Statutes"
 
-            for match in stat_results.matches:
-                cite_id = match.metadata.get('cite_id', 'N/A')
-                title_num = match.metadata.get('title_number', '')
-                section_num = match.metadata.get('section_number', '')
+            result = {
+                'score': match.score,
+                'cite_id': cite_id,
+                'section_name': md.get('page_title', 'Untitled'),
+                'location': location,
+                'document_type': 'statute',
+                'title_number': title_num,
+                'section_number': section_num,
+                'text': '',
+            }
+            results.append(result)
+
+        for match in matches['case_law']:
+            md = match.metadata
+            cite_id = md.get('cite_id', 'N/A')
+            citation = md.get('citation', '')
+            case_title = md.get('case_title', 'Untitled Case')
+            court_type = md.get('court_type', 'unknown')
+
+            # Build location label
+            court_name = self.COURT_NAMES.get(court_type, 'Oklahoma Court')
+            location = f"{court_name} - {citation}" if citation else court_name
+
+            result = {
+                'score': match.score,
+                'cite_id': cite_id,
+                'section_name': case_title,
+                'location': location,
+                'document_type': 'case_law',
+                'citation': citation,
+                'court_type': court_type,
+                'text': '',
+            }
+            results.append(result)
 
-                # Build location label
-                location = "Oklahoma Statutes"
-                if title_num:
-                    location += f" - Title {title_num}"
-                    if section_num:
-                        location += f", Section {section_num}"
+        return results
 
-                result = {
-                    'score': match.score,
-                    'cite_id': cite_id,
-                    'section_name': match.metadata.get('page_title', 'Untitled'),
-                    'location': location,
-                    'document_type': 'statute',
-                    'title_number': title_num,
-                    'section_number': section_num,
-                    'text': self.get_document_text(cite_id),
-                }
-                results.append(result)
-
-            # Search Case Law index
-            print(f"[DEBUG] RAG: Searching Case Law index for: '{query}' (top_k={top_k})")
-            case_results = self.case_law_index.query(
-                vector=query_embedding[0],
-                top_k=top_k,
-                include_metadata=True
+    @staticmethod
+    def select_results(results: List[Dict], top_k: int) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Pick the top_k results and the ones whose text should be fetched
+
+        Returns:
+            (top results, results needing text)
+        """
+        # Top top_k by relevance score (highest first; ties keep index order)
+        top_results = heapq.nlargest(top_k, results, key=itemgetter('score'))
+
+        # Fetch text only for results that will be used: none when even the
+        # best match is off-topic, just the best few when relevance is low
+        max_score = top_results[0]['score'] if top_results else 0
+        if max_score < SKIP_TEXT_SCORE:
+            return top_results, []
+        if max_score < LOW_RELEVANCE_SCORE:
+            return top_results, top_results[:LOW_RELEVANCE_TEXTS]
+        return top_results, top_results
+
+    def record_results(self, top_results: List[Dict], top_k: int, unit_vector):
+        """Log the results summary and remember them in the semantic cache"""
+        # Counting is skipped unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            counts = {'constitution': 0, 'statute': 0, 'case_law': 0}
+            for r in top_results:
+                counts[r['document_type']] += 1
+            logger.debug(
+                "RAG: Returning %d results: %d Constitution, %d Statutes, %d Case Law",
+                len(top_results), counts['constitution'], counts['statute'], counts['case_law']
             )
-            print(f"[DEBUG] RAG: Case Law search returned {len(case_results.matches)} results")
-
-            for match in case_results.matches:
-                cite_id = match.metadata.get('cite_id', 'N/A')
-                citation = match.metadata.get('citation', '')
-                case_title = match.metadata.get('case_title', 'Untitled Case')
-                court_type = match.metadata.get('court_type', 'unknown')
-
-                # Build location label
-                court_name_map = {
-                    'supreme_court': 'Oklahoma Supreme Court',
-                    'criminal_appeals': 'Oklahoma Court of Criminal Appeals',
-                    'civil_appeals': 'Oklahoma Court of Civil Appeals'
-                }
-                location = court_name_map.get(court_type, 'Oklahoma Court')
-                if citation:
-                    location += f" - {citation}"
 
-                result = {
-                    'score': match.score,
-                    'cite_id': cite_id,
-                    'section_name': case_title,
-                    'location': location,
-                    'document_type': 'case_law',
-                    'citation': citation,
-                    'court_type': court_type,
-                    'text': self.get_case_text(cite_id),
-                }
-                results.append(result)
+        if unit_vector is not None:
+            self.semantic_cache_store(unit_vector, top_k, top_results)
 
-            # Sort by relevance score and return top_k
-            results.sort(key=lambda x: x['score'], reverse=True)
+    def search_relevant_sections(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Search for relevant sections from both Constitution and Statutes"""
+        if not self.ready:
+            if not self.initialize():
+                return []
 
-            # Log final results summary
-            const_count = sum(1 for r in results[:top_k] if r['document_type'] == 'constitution')
-            stat_count = sum(1 for r in results[:top_k] if r['document_type'] == 'statute')
-            case_count = sum(1 for r in results[:top_k] if r['document_type'] == 'case_law')
-            print(f"[DEBUG] RAG: Returning {len(results[:top_k])} results: {const_count} Constitution, {stat_count} Statutes, {case_count} Case Law")
+        try:
+            try:
+                query_embedding, unit_vector, cached = self.prepare_query(query, top_k)
+            except ValueError:
+                return []
+            if cached is not None:
+                return cached
+
+            # Query all three indexes concurrently
+            searches = self.index_searches()
+            logger.debug("RAG: Searching Constitution, Statutes and Case Law indexes for: '%s' (top_k=%d)", query, top_k)
+            futures = {
+                self.query_executor.submit(
+                    index.query,
+                    vector=query_embedding,
+                    top_k=top_k,
+                    include_metadata=True
+                ): doc_type
+                for doc_type, (_, index) in searches.items()
+            }
+            matches = {}
+            for future in as_completed(futures):
+                doc_type = futures[future]
+                matches[doc_type] = future.result().matches
+                logger.debug("RAG: %s search returned %d results", searches[doc_type][0], len(matches[doc_type]))
 
-            return results[:top_k]
+            top_results, text_results = self.select_results(self.build_results(matches), top_k)
+            self.fill_texts(text_results)
+            self.record_results(top_results, top_k, unit_vector)
+            return top_results
 
         except Exception as e:
-            print(f"[ERROR] Search failed: {e}")
+            logger.error("Search failed: %s", e)
             return []
 
-    def generate_answer(self, question: str, context_sections: List[Dict], model: str = "gpt-4", conversation_history: List[Dict] = None) -> Dict:
-        """Generate a natural language answer using GPT-4 with conversation history"""
+    @staticmethod
+    def choose_model(question: str, max_score: float, conversation_history: List[Dict] = None) -> str:
+        """Pick the answer model: DEFAULT_MODEL unless the question looks hard"""
+        if (len(question) > ESCALATE_QUESTION_LENGTH
+                or max_score < ESCALATE_MAX_SCORE
+                or len(conversation_history or []) > ESCALATE_HISTORY_MESSAGES):
+            return ESCALATION_MODEL
+        return DEFAULT_MODEL
 
-        # Build context from relevant sections
-        context = ""
-        for i, section in enumerate(context_sections, 1):
-            context += f"\n--- Source {i}: {section['section_name']} ({section['location']}) ---\n"
-            context += f"{section['text']}\n"
+    def prepare_answer(self, question: str, context_sections: List[Dict], model: str, conversation_history: List[Dict] = None):
+        """
+        Look up a cached answer, or build the chat messages for a new one
+
+        Returns:
+            (response cache key, messages or None, cached entry or None)
+        """
+        # Same question over the same sources after the same user turn? Reuse the answer
+        last_user_turn = ''
+        for message in reversed(conversation_history or []):
+            if message.get('role') == 'user':
+                last_user_turn = message.get('content', '')
+                break
+        cache_key = ResponseCache.make_key(
+            question, [s['cite_id'] for s in context_sections], model, last_user_turn
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached:
+            logger.debug("Reusing cached answer")
+            return cache_key, None, cached
 
         # Check relevance scores - if highest score is below 0.5, the question might not be about OK law
         max_score = max([s['score'] for s in context_sections]) if context_sections else 0
         is_likely_ok_law_question = max_score > 0.5
 
+        # Build context from relevant sections
+        context = "".join(
+            f"\n--- Source {i}: {section['section_name']} ({section['location']}) ---\n{section['text']}\n"
+            for i, section in enumerate(context_sections, 1)
+        )
+
         # Create the prompt - different approach based on relevance
         if is_likely_ok_law_question:
             # High relevance - stick to the legal documents
@@ -313,29 +630,114 @@ Here are the closest matches found:
 
 Please answer the question. If it's about Oklahoma law, use the sources above. If it's a general question, you may use your general knowledge to help the user."""
 
-        try:
-            # Build messages array with conversation history
-            messages = [{"role": "system", "content": system_prompt}]
+        # Build messages array with conversation history
+        messages = [{"role": "system", "content": system_prompt}]
+
+        # Add conversation history if available - as many of the newest
+        # messages as fit in the model's context window next to the
+        # prompts and the answer, so the request can't exceed it
+        if conversation_history:
+            budget = (
+                MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+                - ANSWER_MAX_TOKENS
+                - CONTEXT_SLACK_TOKENS
+                - count_tokens(system_prompt, model)
+                - count_tokens(user_prompt, model)
+                - 2 * MESSAGE_OVERHEAD_TOKENS
+            )
+            recent_history = []
+            for message in reversed(conversation_history):
+                tokens = count_tokens(message.get('content') or '', model) + MESSAGE_OVERHEAD_TOKENS
+                if tokens > budget:
+                    break
+                budget -= tokens
+                recent_history.append(message)
+            recent_history.reverse()
+            messages.extend(recent_history)
+            logger.debug("Including %d messages from conversation history", len(recent_history))
+
+        # Add the current question
+        messages.append({"role": "user", "content": user_prompt})
+
+        return cache_key, messages, None
+
+    @staticmethod
+    def generation_error(error_msg: str, context_sections: List[Dict], model: str) -> Dict:
+        """Result dict for a failed generation"""
+        logger.error("GPT generation failed: %s", error_msg)
+
+        # Handle context length errors specifically
+        if 'context_length_exceeded' in error_msg or 'maximum context length' in error_msg:
+            return {
+                'error': 'Context too long',
+                'answer': "The retrieved legal text is too long to process. Please try asking a more specific question or search for specific statutes instead.",
+                'sources': context_sections,
+                'model': model,
+                'tokens_used': 0
+            }
+
+        return {
+            'error': 'Generation failed',
+            'answer': f"Unable to generate answer: {error_msg}",
+            'sources': context_sections,
+            'model': model,
+            'tokens_used': 0
+        }
 
-            # Add conversation history if available (limit to last 10 messages to avoid token limits)
-            if conversation_history:
-                # Only include the last 10 messages to keep context manageable
-                recent_history = conversation_history[-10:] if len(conversation_history) > 10 else conversation_history
-                messages.extend(recent_history)
-                print(f"[DEBUG] Including {len(recent_history)} messages from conversation history")
+    def generate_answer(self, question: str, context_sections: List[Dict], model: Optional[str] = None, conversation_history: List[Dict] = None, stream: bool = False) -> Dict:
+        """
+        Generate a natural language answer using GPT-4 with conversation history
 
-            # Add the current question
-            messages.append({"role": "user", "content": user_prompt})
+        If model is None, choose_model picks one. With stream=True the result
+        also has 'answer_stream', an iterator of answer text deltas; 'answer'
+        and 'tokens_used' are filled in once it is exhausted.
+        """
+        if model is None:
+            max_score = max([s['score'] for s in context_sections]) if context_sections else 0
+            model = self.choose_model(question, max_score, conversation_history)
+
+        try:
+            cache_key, messages, cached = self.prepare_answer(question, context_sections, model, conversation_history)
+            if cached:
+                result = {
+                    'answer': cached['answer'],
+                    'sources': context_sections,
+                    'model': model,
+                    'tokens_used': cached['tokens_used'],
+                    'cached': True
+                }
+                if stream:
+                    result['answer_stream'] = iter([cached['answer']])
+                return result
+
+            if stream:
+                response = self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=ANSWER_MAX_TOKENS,
+                    stream=True,
+                    stream_options={"include_usage": True}  # Usage arrives in a final chunk
+                )
+                result = {
+                    'answer': None,
+                    'sources': context_sections,
+                    'model': model,
+                    'tokens_used': 0
+                }
+                result['answer_stream'] = self._stream_answer(response, cache_key, result)
+                return result
 
             # Call GPT-4 with shorter response limit
             response = self.openai_client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=0.3,  # Lower temperature for more factual responses
-                max_tokens=500  # Reduced from 1000 to ensure concise responses
+                max_tokens=ANSWER_MAX_TOKENS
             )
 
             answer = response.choices[0].message.content
+            self.response_cache.put(cache_key, answer, response.usage.total_tokens)
 
             return {
                 'answer': answer,
@@ -345,36 +747,40 @@ Please answer the question. If it's about Oklahoma law, use the sources above. I
             }
 
         except Exception as e:
-            error_msg = str(e)
-            print(f"[ERROR] GPT generation failed: {error_msg}")
+            return self.generation_error(str(e), context_sections, model)
 
-            # Handle context length errors specifically
-            if 'context_length_exceeded' in error_msg or 'maximum context length' in error_msg:
-                return {
-                    'error': 'Context too long',
-                    'answer': "The retrieved legal text is too long to process. Please try asking a more specific question or search for specific statutes instead.",
-                    'sources': context_sections,
-                    'model': model,
-                    'tokens_used': 0
-                }
+    def _stream_answer(self, response, cache_key: bytes, result: Dict) -> Iterator[str]:
+        """Yield answer text as it arrives, then record the full answer and usage in result"""
+        parts = []
+        try:
+            for chunk in response:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                if chunk.usage:
+                    result['tokens_used'] = chunk.usage.total_tokens
+        except Exception as e:
+            logger.error("GPT streaming failed: %s", e)
+            result['error'] = 'Generation failed'
+            result['answer'] = ''.join(parts)
+            return
 
-            return {
-                'error': 'Generation failed',
-                'answer': f"Unable to generate answer: {error_msg}",
-                'sources': context_sections,
-                'model': model,
-                'tokens_used': 0
-            }
+        result['answer'] = ''.join(parts)
+        self.response_cache.put(cache_key, result['answer'], result['tokens_used'])
 
-    def ask_question(self, question: str, num_sources: int = 3, model: str = "gpt-4", conversation_history: List[Dict] = None) -> Dict:
+    def ask_question(self, question: str, num_sources: int = 3, model: Optional[str] = None, conversation_history: List[Dict] = None, stream: bool = False) -> Dict:
         """
         Main RAG function: Search + Generate Answer
 
         Args:
             question: User's question about Oklahoma law (Constitution and Statutes)
             num_sources: Number of relevant sections to retrieve
-            model: OpenAI model to use (gpt-4, gpt-3.5-turbo, etc.)
+            model: OpenAI model to use (gpt-4, gpt-3.5-turbo, etc.); None picks
+                gpt-4o-mini, or gpt-4o for long, low-relevance or long-running conversations
             conversation_history: Optional conversation history for context
+            stream: Stream the answer (see generate_answer)
 
         Returns:
             Dictionary with answer, sources, and metadata
@@ -387,8 +793,8 @@ Please answer the question. If it's about Oklahoma law, use the sources above. I
                     'sources': []
                 }
 
-        print(f"\nQuestion: {question}")
-        print(f"Searching for {num_sources} relevant sections...")
+        logger.debug("Question: %s", question)
+        logger.debug("Searching for %d relevant sections...", num_sources)
 
         # Step 1: Search for relevant sections
         relevant_sections = self.search_relevant_sections(question, top_k=num_sources)
@@ -400,16 +806,121 @@ Please answer the question. If it's about Oklahoma law, use the sources above. I
                 'sources': []
             }
 
-        print(f"Found {len(relevant_sections)} relevant sections")
-        print("Generating answer with GPT-4...")
+        logger.debug("Found %d relevant sections", len(relevant_sections))
+        logger.debug("Generating answer...")
 
-        # Step 2: Generate answer using GPT-4 with conversation history
-        result = self.generate_answer(question, relevant_sections, model, conversation_history)
+        # Step 2: Generate answer with conversation history
+        result = self.generate_answer(question, relevant_sections, model, conversation_history, stream=stream)
 
-        print(f"[OK] Answer generated ({result['tokens_used']} tokens used)")
+        if stream:
+            logger.debug("Streaming answer")
+        else:
+            logger.debug("Answer generated (%s tokens used)", result['tokens_used'])
 
         return result
 
+    # Async API - the same pipeline for use from an event loop (e.g. an ASGI
+    # app), so concurrent questions share one loop instead of worker threads.
+    # The Pinecone and Supabase clients are sync, so their calls run via
+    # asyncio.to_thread; the chat completion uses openai.AsyncOpenAI.
+
+    async def asearch_relevant_sections(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Async version of search_relevant_sections"""
+        if not self.ready:
+            if not await asyncio.to_thread(self.initialize):
+                return []
+
+        try:
+            try:
+                query_embedding, unit_vector, cached = await asyncio.to_thread(self.prepare_query, query, top_k)
+            except ValueError:
+                return []
+            if cached is not None:
+                return cached
+
+            # Query all three indexes concurrently
+            searches = self.index_searches()
+            logger.debug("RAG: Searching Constitution, Statutes and Case Law indexes for: '%s' (top_k=%d)", query, top_k)
+            responses = await asyncio.gather(*[
+                asyncio.to_thread(index.query, vector=query_embedding, top_k=top_k, include_metadata=True)
+                for _, index in searches.values()
+            ])
+            matches = {doc_type: response.matches for doc_type, response in zip(searches, responses)}
+
+            top_results, text_results = self.select_results(self.build_results(matches), top_k)
+            await asyncio.to_thread(self.fill_texts, text_results)
+            self.record_results(top_results, top_k, unit_vector)
+            return top_results
+
+        except Exception as e:
+            logger.error("Search failed: %s", e)
+            return []
+
+    async def agenerate_answer(self, question: str, context_sections: List[Dict], model: Optional[str] = None, conversation_history: List[Dict] = None) -> Dict:
+        """Async version of generate_answer (no streaming)"""
+        if model is None:
+            max_score = max([s['score'] for s in context_sections]) if context_sections else 0
+            model = self.choose_model(question, max_score, conversation_history)
+
+        try:
+            # Cache lookup (SQLite) and token counting block, so run them off the loop
+            cache_key, messages, cached = await asyncio.to_thread(
+                self.prepare_answer, question, context_sections, model, conversation_history
+            )
+            if cached:
+                return {
+                    'answer': cached['answer'],
+                    'sources': context_sections,
+                    'model': model,
+                    'tokens_used': cached['tokens_used'],
+                    'cached': True
+                }
+
+            if self.async_openai_client is None:
+                import openai
+                self.async_openai_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+            response = await self.async_openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=ANSWER_MAX_TOKENS
+            )
+
+            answer = response.choices[0].message.content
+            await asyncio.to_thread(self.response_cache.put, cache_key, answer, response.usage.total_tokens)
+
+            return {
+                'answer': answer,
+                'sources': context_sections,
+                'model': model,
+                'tokens_used': response.usage.total_tokens
+            }
+
+        except Exception as e:
+            return self.generation_error(str(e), context_sections, model)
+
+    async def aask_question(self, question: str, num_sources: int = 3, model: Optional[str] = None, conversation_history: List[Dict] = None) -> Dict:
+        """Async version of ask_question (no streaming)"""
+        if not self.ready:
+            if not await asyncio.to_thread(self.initialize):
+                return {
+                    'error': 'Failed to initialize RAG system',
+                    'answer': None,
+                    'sources': []
+                }
+
+        relevant_sections = await self.asearch_relevant_sections(question, top_k=num_sources)
+
+        if not relevant_sections:
+            return {
+                'error': 'No relevant sections found',
+                'answer': 'I could not find relevant information in Oklahoma law to answer this question.',
+                'sources': []
+            }
+
+        return await self.agenerate_answer(question, relevant_sections, model, conversation_history)
+
 
 def test_rag():
     """Test the RAG system with sample questions"""
@@ -453,6 +964,7 @@ def test_rag():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     try:
         test_rag()
     except KeyboardInterrupt:
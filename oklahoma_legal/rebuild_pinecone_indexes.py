@@ -5,130 +5,143 @@ WARNING: This will delete all existing vectors and recreate them
 """
 import os
 import json
-from pinecone import Pinecone, ServerlessSpec
-from vector_database_builder import ConstitutionVectorBuilder
-from supabase import create_client
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 # Import configurations
 try:
     from pinecone_config import PINECONE_API_KEY, EMBEDDING_MODEL
-    from config import SUPABASE_URL, SUPABASE_KEY
 except ImportError:
-    from config_production import PINECONE_API_KEY, EMBEDDING_MODEL, SUPABASE_URL, SUPABASE_KEY
+    from config_production import PINECONE_API_KEY, EMBEDDING_MODEL
+
+DELETE_POLL_ATTEMPTS = 30
+DELETE_POLL_INTERVAL = 0.5  # seconds
 
-print("=" * 70)
-print("REBUILD PINECONE INDEXES")
-print("=" * 70)
-print("\nWARNING: This will DELETE all existing vectors and rebuild from scratch!")
-print("This is necessary to fix the mismatch between Pinecone cite_ids and Supabase data.")
-print("\nCurrent situation:")
-print("  - Pinecone has old cite_ids that don't match current Supabase data")
-print("  - Queries return wrong results because cite_ids point to different documents")
-print("\n" + "=" * 70)
+INDEX_NAMES = ["oklahoma-constitution", "oklahoma-statutes"]
 
-response = input("\nAre you sure you want to proceed? (type 'YES' to continue): ")
+def delete_all_vectors(pc, index_name: str):
+    """Delete every vector from one index"""
+    try:
+        print(f"Deleting all vectors from: {index_name}...")
+        pc.Index(index_name).delete(delete_all=True)
+        print(f"[OK] Deleted all vectors from {index_name}")
+    except Exception as e:
+        print(f"[ERROR] Failed to delete vectors from {index_name}: {e}")
 
-if response != 'YES':
-    print("\nAborted. No changes made.")
-    exit(0)
+def wait_until_empty(executor, indexes) -> List[int]:
+    """Poll the indexes (concurrently) until none has vectors or attempts run out; returns the last counts"""
+    for _ in range(DELETE_POLL_ATTEMPTS):
+        counts = list(executor.map(lambda index: index.describe_index_stats().total_vector_count, indexes))
+        if max(counts) == 0:
+            break
+        time.sleep(DELETE_POLL_INTERVAL)
+    return counts
+
+def main():
+    print("=" * 70)
+    print("REBUILD PINECONE INDEXES")
+    print("=" * 70)
+    print("\nWARNING: This will DELETE all existing vectors and rebuild from scratch!")
+    print("This is necessary to fix the mismatch between Pinecone cite_ids and Supabase data.")
+    print("\nCurrent situation:")
+    print("  - Pinecone has old cite_ids that don't match current Supabase data")
+    print("  - Queries return wrong results because cite_ids point to different documents")
+    print("\n" + "=" * 70)
+
+    response = input("\nAre you sure you want to proceed? (type 'YES' to continue): ")
+
+    if response != 'YES':
+        print("\nAborted. No changes made.")
+        return
+
+    print("\n" + "=" * 70)
+    print("STEP 1: Initialize clients")
+    print("=" * 70)
+
+    # Client libraries are imported only once the rebuild is confirmed
+    from pinecone import Pinecone
+    from vector_database_builder import ConstitutionVectorBuilder
+
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    builder = ConstitutionVectorBuilder()
+
+    if not builder.setup_clients():
+        print("[ERROR] Failed to setup clients")
+        exit(1)
+
+    print("[OK] Clients initialized")
+
+    # Check current index stats before deletion
+    print("\n" + "=" * 70)
+    print("STEP 2: Check current indexes")
+    print("=" * 70)
 
-print("\n" + "=" * 70)
-print("STEP 1: Initialize clients")
-print("=" * 70)
+    try:
+        const_index = pc.Index("oklahoma-constitution")
+        stat_index = pc.Index("oklahoma-statutes")
 
-pc = Pinecone(api_key=PINECONE_API_KEY)
-builder = ConstitutionVectorBuilder()
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        const_stats = const_index.describe_index_stats()
+        stat_stats = stat_index.describe_index_stats()
 
-if not builder.setup_clients():
-    print("[ERROR] Failed to setup clients")
-    exit(1)
+        print(f"Current Constitution vectors: {const_stats.total_vector_count}")
+        print(f"Current Statutes vectors: {stat_stats.total_vector_count}")
 
-print("[OK] Clients initialized")
+    except Exception as e:
+        print(f"[WARNING] Could not get current stats: {e}")
 
-# Check current index stats before deletion
-print("\n" + "=" * 70)
-print("STEP 2: Check current indexes")
-print("=" * 70)
+    print("\n" + "=" * 70)
+    print("STEP 3: Delete all vectors from existing indexes")
+    print("=" * 70)
+
+    # Instead of deleting indexes, delete all vectors
+    # This is safer and faster. Both deletes are issued at once.
+    executor = ThreadPoolExecutor(max_workers=len(INDEX_NAMES))
+    list(executor.map(lambda index_name: delete_all_vectors(pc, index_name), INDEX_NAMES))
+
+    print("\n" + "=" * 70)
+    print("STEP 4: Verify indexes are empty")
+    print("=" * 70)
 
-try:
     const_index = pc.Index("oklahoma-constitution")
     stat_index = pc.Index("oklahoma-statutes")
 
-    const_stats = const_index.describe_index_stats()
-    stat_stats = stat_index.describe_index_stats()
+    # Poll until deletion has finished instead of sleeping a fixed time
+    const_count, stat_count = wait_until_empty(executor, [const_index, stat_index])
+    executor.shutdown()
 
-    print(f"Current Constitution vectors: {const_stats.total_vector_count}")
-    print(f"Current Statutes vectors: {stat_stats.total_vector_count}")
+    print(f"Constitution vectors: {const_count} (should be 0)")
+    print(f"Statutes vectors: {stat_count} (should be 0)")
 
-except Exception as e:
-    print(f"[WARNING] Could not get current stats: {e}")
+    if const_count > 0 or stat_count > 0:
+        print("\n[WARNING] Some vectors still remain after waiting for deletion")
 
-print("\n" + "=" * 70)
-print("STEP 3: Delete all vectors from existing indexes")
-print("=" * 70)
+    print("[OK] Indexes are ready for new data")
 
-# Instead of deleting indexes, delete all vectors
-# This is safer and faster
-for index_name in ["oklahoma-constitution", "oklahoma-statutes"]:
-    try:
-        print(f"Deleting all vectors from: {index_name}...")
-        index = pc.Index(index_name)
-        index.delete(delete_all=True)
-        print(f"[OK] Deleted all vectors from {index_name}")
+    print("\n" + "=" * 70)
+    print("STEP 5: Re-upload embeddings")
+    print("=" * 70)
 
-        # Wait for deletion to complete
-        import time
-        time.sleep(3)
-    except Exception as e:
-        print(f"[ERROR] Failed to delete vectors from {index_name}: {e}")
+    print("\nNow you need to run the embedding generation script:")
+    print("\n  python generate_and_upload_embeddings.py")
+    print("\nThis will:")
+    print("  1. Read all documents from Supabase")
+    print("  2. Generate embeddings with text-embedding-3-small")
+    print("  3. Upload to the correct Pinecone index based on document_type")
+    print("  4. Use the CURRENT cite_ids from Supabase")
 
-print("\n" + "=" * 70)
-print("STEP 4: Verify indexes are empty")
-print("=" * 70)
+    print("\n" + "=" * 70)
+    print("INDEX REBUILD COMPLETE")
+    print("=" * 70)
 
-const_index = pc.Index("oklahoma-constitution")
-stat_index = pc.Index("oklahoma-statutes")
+    print("\nNext steps:")
+    print("1. Run: python generate_and_upload_embeddings.py")
+    print("2. Wait for all 50,091 embeddings to be generated and uploaded")
+    print("3. Test the app locally to verify correct results")
+    print("4. Deploy to production (Render will use the updated indexes)")
 
-import time
-time.sleep(5)  # Wait for deletion to complete
-
-const_stats = const_index.describe_index_stats()
-stat_stats = stat_index.describe_index_stats()
-
-print(f"Constitution vectors: {const_stats.total_vector_count} (should be 0)")
-print(f"Statutes vectors: {stat_stats.total_vector_count} (should be 0)")
-
-if const_stats.total_vector_count > 0 or stat_stats.total_vector_count > 0:
-    print("\n[WARNING] Some vectors still remain. Waiting longer for deletion...")
-    time.sleep(10)
-    const_stats = const_index.describe_index_stats()
-    stat_stats = stat_index.describe_index_stats()
-    print(f"Constitution vectors: {const_stats.total_vector_count}")
-    print(f"Statutes vectors: {stat_stats.total_vector_count}")
-
-print("[OK] Indexes are ready for new data")
-
-print("\n" + "=" * 70)
-print("STEP 5: Re-upload embeddings")
-print("=" * 70)
-
-print("\nNow you need to run the embedding generation script:")
-print("\n  python generate_and_upload_embeddings.py")
-print("\nThis will:")
-print("  1. Read all documents from Supabase")
-print("  2. Generate embeddings with text-embedding-3-small")
-print("  3. Upload to the correct Pinecone index based on document_type")
-print("  4. Use the CURRENT cite_ids from Supabase")
-
-print("\n" + "=" * 70)
-print("INDEX REBUILD COMPLETE")
-print("=" * 70)
-
-print("\nNext steps:")
-print("1. Run: python generate_and_upload_embeddings.py")
-print("2. Wait for all 50,091 embeddings to be generated and uploaded")
-print("3. Test the app locally to verify correct results")
-print("4. Deploy to production (Render will use the updated indexes)")
-
-print("\n" + "=" * 70)
+    print("\n" + "=" * 70)
+
+
+if __name__ == "__main__":
+    main()
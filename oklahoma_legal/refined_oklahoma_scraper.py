@@ -5,16 +5,80 @@ Based on analysis of actual HTML structure
 """
 
 import requests
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import NavigableString, SoupStrainer
 import time
 import json
 import re
+from html import unescape
+from functools import lru_cache
+from itertools import chain
 from urllib.parse import urljoin, urlparse
 import logging
 
+from html_helpers import make_soup, make_tree
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Document header parts (e.g. "Title 68. Revenue and Taxation")
+_TITLE_RE = re.compile(r'Title (\d+[A-Z]?)\. (.+)')
+_CHAPTER_RE = re.compile(r'Chapter (\d+[A-Z]?) - (.+)')
+_ARTICLE_RE = re.compile(r'Article (?:Article )?(\d+[A-Z]?) - (.+)')
+_SECTION_RE = re.compile(r'Section\s+(\d+[A-Z]?) - (.+)')
+_HISTORICAL_DATA_RE = re.compile(r'Historical Data')
+_CITEID_RE = re.compile(r'CiteID=(\d+)')
+
+# (number key, name key, pattern) for the header lines shared by every
+# section of a title/chapter/article
+_HEADER_LINE_FIELDS = (
+    ('title_number', 'title_name', _TITLE_RE),
+    ('chapter_number', 'chapter_name', _CHAPTER_RE),
+    ('article_number', 'article_name', _ARTICLE_RE),
+)
+
+# Statute body paragraphs; a <p> may be closed implicitly by the next <p>
+_P_RE = re.compile(r'<p\b[^>]*>(.*?)(?=</p>|<p\b|$)', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+# Inline scripts and styles are not page text (get_text() leaves them out too)
+_SCRIPT_STYLE_RE = re.compile(r'<script\b.*?</script\s*>|<style\b.*?</style\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Scrape results, one JSON object per line
+RESULTS_JSONL = 'refined_statute_results.jsonl'
+
+def html_to_text(fragment):
+    """Text content of an HTML fragment (comments, scripts, styles and tags dropped, entities decoded)"""
+    return unescape(_TAG_RE.sub('', _SCRIPT_STYLE_RE.sub('', _COMMENT_RE.sub('', fragment))))
+
+@lru_cache(maxsize=4096)
+def parse_header_line(line):
+    """
+    Title/chapter/article fields found in one document header line
+
+    Cached: a batch scrape sees the same few header lines on every section
+    of a title, so repeats are a dict lookup instead of three regex scans.
+    The returned dict is shared - don't modify it.
+    """
+    fields = {}
+    for number_key, name_key, pattern in _HEADER_LINE_FIELDS:
+        match = pattern.search(line)
+        if match:
+            fields[number_key] = match.group(1)
+            fields[name_key] = match.group(2)
+    return fields
+
+def jsonl_line(result):
+    """A result as one UTF-8 JSON line (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result) + b'\n'
+    return (json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8')
+
 class RefinedOklahomaStatutesScraper:
     def __init__(self):
         self.base_url = "https://www.oscn.net"
@@ -43,26 +107,15 @@ class RefinedOklahomaStatutesScraper:
             # The title structure is complex, let's extract the key parts
             title_text = title_div.get_text()
 
-            # Extract title number (e.g., "Title 68")
-            title_match = re.search(r'Title (\d+[A-Z]?)\. (.+)', title_text)
-            if title_match:
-                metadata['title_number'] = title_match.group(1)
-                metadata['title_name'] = title_match.group(2)
-
-            # Extract chapter
-            chapter_match = re.search(r'Chapter (\d+[A-Z]?) - (.+)', title_text)
-            if chapter_match:
-                metadata['chapter_number'] = chapter_match.group(1)
-                metadata['chapter_name'] = chapter_match.group(2)
-
-            # Extract article if present
-            article_match = re.search(r'Article (?:Article )?(\d+[A-Z]?) - (.+)', title_text)
-            if article_match:
-                metadata['article_number'] = article_match.group(1)
-                metadata['article_name'] = article_match.group(2)
-
-            # Extract section
-            section_match = re.search(r'Section\s+(\d+[A-Z]?) - (.+)', title_text)
+            # Extract title number (e.g., "Title 68"), chapter and article if
+            # present - these patterns never span lines, so the first line
+            # that matches gives the same result as searching the whole text
+            for line in title_text.split('\n'):
+                for key, value in parse_header_line(line).items():
+                    metadata.setdefault(key, value)
+
+            # Extract section (unique per page, so not cached)
+            section_match = _SECTION_RE.search(title_text)
             if section_match:
                 metadata['section_number'] = section_match.group(1)
                 metadata['section_name'] = section_match.group(2)
@@ -79,58 +132,70 @@ class RefinedOklahomaStatutesScraper:
 
         return metadata
 
-    def extract_statute_content(self, soup):
-        """Extract the actual statute text content"""
+    def extract_statute_content(self, soup, html=None):
+        """Extract the actual statute text content (from the raw page HTML when given)"""
         content = {}
 
         # The main content appears to be between <!--BEGIN DOCUMENT--> and <!--END DOCUMENT-->
-        html_text = str(soup)
+        html_text = html if html is not None else str(soup)
 
         # Find document content using comments as markers
         begin_marker = "<!--BEGIN DOCUMENT-->"
         end_marker = "<!--END DOCUMENT-->"
 
+        # The end marker is only searched for past the begin marker
         begin_idx = html_text.find(begin_marker)
-        end_idx = html_text.find(end_marker)
-
-        if begin_idx != -1 and end_idx != -1:
-            # Extract the content between markers
-            content_html = html_text[begin_idx + len(begin_marker):end_idx]
-            content_soup = BeautifulSoup(content_html, 'html.parser')
-
-            # Extract paragraphs
-            paragraphs = content_soup.find_all('p')
-            content['paragraphs'] = []
-
-            for i, para in enumerate(paragraphs, 1):
-                para_text = para.get_text().strip()
-                if para_text:  # Skip empty paragraphs
-                    content['paragraphs'].append({
-                        'number': i,
-                        'text': para_text
-                    })
-
-            # Get full text
-            content['full_text'] = content_soup.get_text().strip()
-
-        # Extract historical data if present
-        historical_section = soup.find('b', string=re.compile(r'Historical Data'))
+        end_idx = html_text.find(end_marker, begin_idx + len(begin_marker)) if begin_idx != -1 else -1
+
+        # Index and error pages have no document markers (and no statute
+        # content) - skip the paragraph and historical-data scans entirely
+        if end_idx == -1:
+            return content
+
+        # Extract the content between markers
+        # (string slicing + regexes - no second parse of the slice)
+        content_html = html_text[begin_idx + len(begin_marker):end_idx]
+
+        # Extract paragraphs
+        content['paragraphs'] = []
+
+        for i, para_match in enumerate(_P_RE.finditer(content_html), 1):
+            para_text = html_to_text(para_match.group(1)).strip()
+            if para_text:  # Skip empty paragraphs
+                content['paragraphs'].append({
+                    'number': i,
+                    'text': para_text
+                })
+
+        # Get full text
+        content['full_text'] = html_to_text(content_html).strip()
+
+        # Extract historical data if present (the tree walk only runs when
+        # the raw page contains the heading at all)
+        historical_section = None
+        if 'Historical Data' in html_text:
+            historical_section = soup.find('b', string=_HISTORICAL_DATA_RE)
         if historical_section:
             # Find the next HR tag to get the historical content
-            historical_content = ""
-            current = historical_section.parent
-            while current and current.name != 'hr':
-                if hasattr(current, 'get_text'):
-                    historical_content += current.get_text()
-                current = current.next_sibling
+            # (pieces joined once instead of repeated string concatenation)
+            parent = historical_section.parent
+            parts = []
+            for node in chain((parent,), parent.next_siblings):
+                if node.name == 'hr':
+                    break
+                parts.append(node.get_text())
+            historical_content = ''.join(parts)
 
             if historical_content:
                 content['historical_data'] = historical_content.strip()
 
         return content
 
-    def extract_navigation_links(self, soup):
-        """Extract navigation links to related statutes"""
+    def extract_navigation_links(self, soup, tree=None):
+        """Extract navigation links to related statutes (via XPath when an lxml tree is given)"""
+        if tree is not None:
+            return self._extract_navigation_links_xpath(tree)
+
         links = {}
 
         # Extract from the statutes navigation bar
@@ -163,6 +228,38 @@ class RefinedOklahomaStatutesScraper:
 
         return links
 
+    def _extract_navigation_links_xpath(self, tree):
+        """extract_navigation_links over an lxml tree - traversal runs in C"""
+        links = {}
+
+        # Extract from the statutes navigation bar
+        nav_divs = tree.xpath("//div[@id='statutes-navigation']")
+        if nav_divs:
+            for link in nav_divs[0].xpath(".//a"):
+                if 'javascript:' in link.get('href', ''):
+                    # These are JavaScript navigation functions
+                    links[link.text_content().strip()] = link.get('href')
+
+        # Extract citation links from the table of authority
+        tables = tree.xpath("//table")
+        if tables:
+            citation_links = []
+            for row in tables[0].xpath(".//tr")[1:]:  # Skip header
+                cells = row.xpath(".//td")
+                if len(cells) >= 3:
+                    cite_links = cells[1].xpath(".//a")
+                    name_links = cells[2].xpath(".//a")
+                    if cite_links and name_links:
+                        citation_links.append({
+                            'cite': cite_links[0].text_content().strip(),
+                            'name': name_links[0].text_content().strip(),
+                            'href': cite_links[0].get('href')
+                        })
+
+            links['citations'] = citation_links
+
+        return links
+
     def scrape_statute(self, cite_id):
         """Scrape a single statute by its cite ID"""
         url = f"{self.base_url}/applications/oscn/DeliverDocument.asp?CiteID={cite_id}"
@@ -172,15 +269,16 @@ class RefinedOklahomaStatutesScraper:
         if not html:
             return None
 
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
+        tree = make_tree(html)
 
         # Extract all components
         result = {
             'cite_id': cite_id,
             'url': url,
             'metadata': self.extract_statute_metadata(soup),
-            'content': self.extract_statute_content(soup),
-            'navigation': self.extract_navigation_links(soup),
+            'content': self.extract_statute_content(soup, html),
+            'navigation': self.extract_navigation_links(soup, tree),
             'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
         }
 
@@ -195,21 +293,26 @@ class RefinedOklahomaStatutesScraper:
         if not html:
             return []
 
-        soup = BeautifulSoup(html, 'html.parser')
-
         # Find all statute links (this would need to be refined based on the actual index structure)
         statute_links = []
-        links = soup.find_all('a', href=True)
+        tree = make_tree(html)
+        if tree is not None:
+            links = tree.xpath("//a[contains(@href, 'DeliverDocument.asp?CiteID=')]")
+            get_text = lambda link: link.text_content()
+        else:
+            # Only <a href> tags are built into the tree
+            links = make_soup(html, parse_only=SoupStrainer('a', href=True)).find_all('a', href=True)
+            get_text = lambda link: link.get_text()
 
         for link in links:
-            href = link['href']
+            href = link.get('href')
             if 'DeliverDocument.asp?CiteID=' in href:
-                cite_id_match = re.search(r'CiteID=(\d+)', href)
+                cite_id_match = _CITEID_RE.search(href)
                 if cite_id_match:
                     cite_id = cite_id_match.group(1)
                     statute_links.append({
                         'cite_id': cite_id,
-                        'text': link.get_text().strip(),
+                        'text': get_text(link).strip(),
                         'url': urljoin(self.base_url, href)
                     })
 
@@ -251,11 +354,11 @@ def test_refined_scraper():
             else:
                 print(f"{key}: {value}")
 
-        # Save to file
-        with open('refined_statute_result.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        # Append to the results file
+        with open(RESULTS_JSONL, 'ab') as f:
+            f.write(jsonl_line(result))
 
-        print(f"\nResults saved to: refined_statute_result.json")
+        print(f"\nResults appended to: {RESULTS_JSONL}")
     else:
         print("Failed to scrape statute")
 
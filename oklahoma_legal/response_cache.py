@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of generated RAG answers
+
+Stores GPT answers in a local SQLite database keyed by a hash of the
+question, the sources it was answered from, the model and the previous
+user turn, so repeated questions don't trigger another chat completion.
+Entries expire after a TTL so answers pick up prompt/model changes.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_PATH = 'response_cache.sqlite3'
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+
+class ResponseCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: How long a stored answer stays valid
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # Flask/gunicorn serve requests on worker threads; the lock serializes access
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key BLOB PRIMARY KEY,
+                answer TEXT NOT NULL,
+                tokens_used INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(question: str, cite_ids: List[str], model: str, last_user_turn: str = '') -> bytes:
+        """SHA-256 of everything the answer depends on (question is case/whitespace-normalized)"""
+        normalized_question = ' '.join(question.lower().split())
+        payload = json.dumps([normalized_question, sorted(cite_ids), model, last_user_turn])
+        return hashlib.sha256(payload.encode('utf-8')).digest()
+
+    def get(self, cache_key: bytes) -> Optional[Dict]:
+        """Return {'answer', 'tokens_used'} for an unexpired entry, else None"""
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT answer, tokens_used FROM response_cache WHERE cache_key = ? AND created_at > ?",
+                (cache_key, cutoff)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'answer': row[0], 'tokens_used': row[1]}
+
+    def put(self, cache_key: bytes, answer: str, tokens_used: int):
+        """Store an answer (replacing any older one) and drop expired entries"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, answer, tokens_used, created_at) VALUES (?, ?, ?, ?)",
+                (cache_key, answer, tokens_used, now)
+            )
+            self.conn.execute("DELETE FROM response_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -3,72 +3,116 @@ Retry downloading failed statute documents from OSCN.
 Reads failed entries from statute_download_progress.json and retries them.
 """
 
+import codecs
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuration
 PROGRESS_FILE = "statute_download_progress.json"
 HTML_DIR = Path("statute_html")
 TIMEOUT = 60  # Increased from 30 to 60 seconds
-DELAY_BETWEEN_REQUESTS = 2  # 2 seconds between requests
+DELAY_BETWEEN_REQUESTS = 2  # 2 seconds between requests (spread across the workers)
+RETRY_WORKERS = 8  # Downloads in flight at once
+MAX_RETRIES = 3  # Per download, with exponential backoff (honors Retry-After)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk while streaming a page to disk
+
+# One keep-alive session for all downloads, so the TCP/TLS handshake with
+# oscn.net is paid once per pooled connection instead of once per request.
+# urllib3 retries timeouts, connection errors and 5xx responses itself.
+RETRY_POLICY = Retry(
+    total=MAX_RETRIES,
+    backoff_factor=1,
+    status_forcelist=[500, 502, 503, 504],
+    allowed_methods=['GET'],
+    raise_on_status=False  # Hand back the last 5xx response instead of raising
+)
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+# pool_block: a worker waits for a pooled connection rather than opening a
+# throwaway one, so DNS lookups and TLS handshakes happen at most once per
+# pooled connection
+for prefix in ('https://', 'http://'):
+    SESSION.mount(prefix, HTTPAdapter(
+        pool_connections=1,  # Single host (oscn.net)
+        pool_maxsize=RETRY_WORKERS,
+        pool_block=True,
+        max_retries=RETRY_POLICY
+    ))
 
 def load_progress():
-    """Load the progress file"""
+    """Load the progress file (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        with open(PROGRESS_FILE, 'rb') as f:
+            return orjson.loads(f.read())
     with open(PROGRESS_FILE, 'r') as f:
         return json.load(f)
 
 def save_progress(data):
-    """Save updated progress"""
+    """Save updated progress (orjson when available)"""
     data['last_updated'] = datetime.now().isoformat()
+    if ORJSON_AVAILABLE:
+        with open(PROGRESS_FILE, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
     with open(PROGRESS_FILE, 'w') as f:
         json.dump(data, f, indent=2)
 
-def download_statute(cite_id, url, max_retries=3):
+def download_statute(cite_id, url, filename):
     """
-    Download a single statute with retries
+    Download a single statute straight to disk (retries happen in SESSION's adapter)
+
+    The body is streamed in chunks and re-encoded to UTF-8 as it arrives,
+    so a page is never held in memory whole. It is written to a .part file
+    that only replaces filename once the download completes.
 
     Args:
         cite_id: The CiteID for the statute
         url: The URL to download from
-        max_retries: Maximum number of retry attempts
+        filename: Path to save the HTML to
 
     Returns:
-        tuple: (success: bool, html_content: str or None, error_msg: str or None)
+        tuple: (success: bool, error_msg: str or None)
     """
-    for attempt in range(max_retries):
-        try:
-            print(f"  Attempt {attempt + 1}/{max_retries}...", end=" ")
-
-            response = requests.get(
-                url,
-                timeout=TIMEOUT,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-            )
-
-            if response.status_code == 200:
-                print("SUCCESS")
-                return True, response.text, None
-            else:
-                print(f"FAILED: HTTP {response.status_code}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-
-        except requests.exceptions.Timeout:
-            print(f"TIMEOUT")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-
-        except Exception as e:
-            print(f"ERROR: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-
-    return False, None, f"Failed after {max_retries} attempts"
+    partial = filename.with_name(filename.name + '.part')
+    try:
+        with SESSION.get(url, timeout=TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                print(f"  [{cite_id}] FAILED: HTTP {response.status_code}")
+                return False, f"HTTP {response.status_code}"
+
+            # Same charset handling as response.text (OSCN serves ISO-8859-1)
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            with open(partial, 'w', encoding='utf-8') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(decoder.decode(chunk))
+                f.write(decoder.decode(b'', final=True))
+        partial.replace(filename)
+
+    except requests.exceptions.Timeout:
+        print(f"  [{cite_id}] TIMEOUT")
+        partial.unlink(missing_ok=True)
+        return False, f"Timed out after {MAX_RETRIES} retries"
+    except Exception as e:
+        print(f"  [{cite_id}] ERROR: {e}")
+        partial.unlink(missing_ok=True)
+        return False, f"Failed after {MAX_RETRIES} retries: {e}"
+
+    print(f"  [{cite_id}] SUCCESS")
+    return True, None
 
 def main():
     """Main retry function"""
@@ -94,20 +138,26 @@ def main():
     newly_successful = []
     still_failed = []
 
-    # Retry each failed download
+    # Retry the failed downloads concurrently; results are handled in list order
+    executor = ThreadPoolExecutor(max_workers=RETRY_WORKERS)
+    futures = []
     for i, failed_item in enumerate(failed_list, 1):
         cite_id = failed_item['cite_id']
-        url = failed_item['url']
-
         print(f"[{i}/{len(failed_list)}] Retrying CiteID {cite_id}...")
+        futures.append(executor.submit(download_statute, cite_id, failed_item['url'], HTML_DIR / f"{cite_id}.html"))
 
-        success, html_content, error_msg = download_statute(cite_id, url)
+        # Delay between requests
+        if i < len(failed_list):
+            time.sleep(DELAY_BETWEEN_REQUESTS / RETRY_WORKERS)
+
+    for failed_item, future in zip(failed_list, futures):
+        cite_id = failed_item['cite_id']
+        url = failed_item['url']
+
+        success, error_msg = future.result()
 
         if success:
-            # Save the HTML file
             filename = HTML_DIR / f"{cite_id}.html"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_content)
 
             # Add to successful downloads
             newly_successful.append({
@@ -129,9 +179,7 @@ def main():
             })
             print(f"  STILL FAILED: {error_msg}\n")
 
-        # Delay between requests
-        if i < len(failed_list):
-            time.sleep(DELAY_BETWEEN_REQUESTS)
+    executor.shutdown()
 
     # Update progress file
     print("\n" + "=" * 70)
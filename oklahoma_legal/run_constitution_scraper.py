@@ -4,32 +4,24 @@ Simple runner script for Oklahoma Constitution scraping
 Execute this to automatically discover and scrape constitution sections
 """
 
-import subprocess
-import sys
 import os
 
-def run_command(command, description):
-    """Run a command and show progress"""
+def run_step(step, description, *args):
+    """
+    Run a step's main() in this process and show progress
+
+    Steps share this interpreter (no per-step startup or re-imports) and
+    print directly, so their output and prompts appear as they happen.
+    """
     print(f"\n{description}")
     print("=" * 50)
 
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            print(result.stdout)
-            if result.stderr:
-                print("Warnings/Info:")
-                print(result.stderr)
-            return True
-        else:
-            print(f"Error running command: {command}")
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-            return False
+        step(*args)
+        return True
 
     except Exception as e:
-        print(f"Exception running command: {e}")
+        print(f"Exception running {step.__module__}: {e}")
         return False
 
 def main():
@@ -48,7 +40,8 @@ def main():
 
     # Step 1: Explore constitution structure
     print("\nSTEP 1: Discovering Oklahoma Constitution sections on OSCN...")
-    success = run_command("python explore_constitution.py", "Exploring constitution structure")
+    from explore_constitution import main as explore_main
+    success = run_step(explore_main, "Exploring constitution structure")
 
     if not success:
         print("Failed to explore constitution structure.")
@@ -64,8 +57,8 @@ def main():
         print("Trying search mode...")
 
         # Step 2: Search mode if exploration didn't work
-        success = run_command("python bulk_scrape_constitution.py --search",
-                             "Searching for constitution sections")
+        from bulk_scrape_constitution import main as bulk_scrape_main
+        success = run_step(bulk_scrape_main, "Searching for constitution sections", ['--search'])
 
         if not success:
             print("Search also failed. You may need to manually find constitution cite IDs.")
@@ -73,8 +66,8 @@ def main():
 
     # Step 3: Bulk scrape
     print("\nSTEP 2: Starting bulk scrape of constitution sections...")
-    success = run_command("python bulk_scrape_constitution.py",
-                          "Bulk scraping constitution sections")
+    from bulk_scrape_constitution import main as bulk_scrape_main
+    success = run_step(bulk_scrape_main, "Bulk scraping constitution sections", [])
 
     if success:
         print("\n" + "=" * 60)
@@ -83,7 +76,8 @@ def main():
 
         # Show final database stats
         print("\nFinal step: Checking database contents...")
-        run_command("python show_data.py", "Showing database contents")
+        from show_data import show_all_data
+        run_step(show_all_data, "Showing database contents")
 
         print("\nFiles created:")
         files_to_check = [
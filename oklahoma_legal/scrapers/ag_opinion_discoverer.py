@@ -5,13 +5,54 @@ Discovers all CiteIDs for AG opinions from 2020-2025 (MVP scope)
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import SoupStrainer
 from typing import List, Dict, Set
+from concurrent.futures import ThreadPoolExecutor
 import time
 import json
 import re
+import os
+import sys
 from datetime import datetime
 
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from html_helpers import make_soup, make_tree
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Year index pages fetched concurrently, and pooled keep-alive connections
+DISCOVERY_WORKERS = 4
+HTTP_POOL_SIZE = 16
+
+# Document links: DeliverDocument.asp?CiteID=XXXXX
+_CITEID_RE = re.compile(r'DeliverDocument\.asp\?CiteID=(\d+)', re.IGNORECASE)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    # Falls back to lxml XPath / BeautifulSoup
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+
+    # Compiled once; plain strings rather than "smart" strings, which each
+    # keep a reference back to their <a> element
+    _HREF_XPATH = etree.XPath("//a/@href", smart_strings=False)
+except ImportError:
+    # Falls back to BeautifulSoup traversal (slower)
+    LXML_AVAILABLE = False
+
 class AGOpinionDiscoverer:
     """Discover all AG opinion CiteIDs from OSCN"""
 
@@ -21,6 +62,9 @@ class AGOpinionDiscoverer:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (Oklahoma Legal Research Bot - Educational Purpose)'
         })
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
         # AG opinions database
         self.ag_database = 'STOKAG'
@@ -36,27 +80,31 @@ class AGOpinionDiscoverer:
         Discover all AG opinion CiteIDs for 2020-2025
 
         Returns:
-            List of cite_ids
+            List of unique cite_ids (numeric order)
         """
         print("="*60)
         print("Oklahoma Attorney General Opinion Discovery Crawler")
         print("MVP Scope: 2020-2025")
         print("="*60)
 
-        cite_ids = []
-
-        for year in self.years:
-            print(f"\n  Discovering {year} AG opinions...")
+        # Years are independent - fetch them concurrently over the pooled session
+        print(f"\n  Discovering {len(self.years)} years of AG opinions ({DISCOVERY_WORKERS} workers)...")
+        with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+            futures = []
+            for year in self.years:
+                futures.append((year, executor.submit(self.discover_year_opinions, year)))
 
-            year_cite_ids = self.discover_year_opinions(year)
-            cite_ids.extend(year_cite_ids)
+                # Rate limiting (spread across the workers)
+                time.sleep(self.rate_limit_delay / DISCOVERY_WORKERS)
 
-            print(f"    Found {len(year_cite_ids)} opinions for {year}")
+            for year, future in futures:
+                year_cite_ids = future.result()
+                # Cross-indexed opinions show up under more than one year - keep one
+                self.discovered_cite_ids.update(year_cite_ids)
 
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
+                print(f"    Found {len(year_cite_ids)} opinions for {year}")
 
-        return cite_ids
+        return sorted(self.discovered_cite_ids, key=int)
 
     def discover_year_opinions(self, year: int) -> List[str]:
         """
@@ -75,10 +123,8 @@ class AGOpinionDiscoverer:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-
             # Find all links to DeliverDocument.asp with CiteID
-            cite_ids = self.extract_cite_ids(soup)
+            cite_ids = self.extract_cite_ids(response.text)
 
             return cite_ids
 
@@ -86,24 +132,34 @@ class AGOpinionDiscoverer:
             print(f"    ERROR fetching {url}: {e}")
             return []
 
-    def extract_cite_ids(self, soup: BeautifulSoup) -> List[str]:
+    def extract_cite_ids(self, html: str) -> List[str]:
         """
         Extract CiteIDs from page HTML
 
         Args:
-            soup: BeautifulSoup object
+            html: Page HTML
 
         Returns:
             List of unique CiteIDs
         """
         cite_ids = set()
 
-        # Find all links to DeliverDocument.asp
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        # All link targets - selectolax builds no Python tree at all, lxml
+        # runs one XPath call in C, else a BS4 walk
+        if SELECTOLAX_AVAILABLE:
+            hrefs = [link.attributes['href'] or '' for link in LexborHTMLParser(html).css('a[href]')]
+        else:
+            tree = make_tree(html)
+            if tree is not None:
+                hrefs = _HREF_XPATH(tree)
+            else:
+                links = make_soup(html, parse_only=SoupStrainer('a', href=True))
+                hrefs = [link['href'] for link in links.find_all('a', href=True)]
 
+        # Find all links to DeliverDocument.asp
+        for href in hrefs:
             # Match pattern: DeliverDocument.asp?CiteID=XXXXX
-            match = re.search(r'DeliverDocument\.asp\?CiteID=(\d+)', href, re.IGNORECASE)
+            match = _CITEID_RE.search(href)
             if match:
                 cite_id = match.group(1)
                 cite_ids.add(cite_id)
@@ -126,8 +182,12 @@ class AGOpinionDiscoverer:
             'cite_ids': cite_ids
         }
 
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
+        if ORJSON_AVAILABLE:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(output, f, indent=2)
 
         print(f"\n[OK] Saved discovered AG opinions to: {filename}")
         print(f"  Total opinions found: {len(cite_ids)}")
@@ -142,8 +202,12 @@ class AGOpinionDiscoverer:
         Returns:
             List of cite_ids
         """
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(filename, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filename, 'r') as f:
+                data = json.load(f)
 
         return data['cite_ids']
 
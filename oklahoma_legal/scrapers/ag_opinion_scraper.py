@@ -5,14 +5,148 @@ Scrapes individual AG opinion pages and extracts structured data
 """
 
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import re
 from datetime import datetime
 from supabase import create_client
 import os
+import sys
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from html_helpers import make_soup
+from scrapers.scraper_utils import RateLimiter
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    # Falls back to BeautifulSoup + lxml (slower)
+    SELECTOLAX_AVAILABLE = False
+
+# Pages fetched concurrently; requests start rate_limit_delay / SCRAPE_WORKERS
+# apart, and at most SCRAPE_CHUNK_SIZE pages are queued ahead of the caller
+SCRAPE_WORKERS = 4
+SCRAPE_CHUNK_SIZE = 50
+
+# Timeouts, connection errors, 429s and 5xx responses are retried by urllib3
+# with exponential backoff (honoring Retry-After) before scrape_* gives up
+FETCH_RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET']
+)
+
+# Parser patterns, compiled once at import
+_CITATION_RE = re.compile(r'\d{4}\s+OK\s+AG\s+\d+')  # "2025 OK AG 3"
+_OPINION_NUMBER_RE = re.compile(r'AG\s+(\d+)')
+_CITATION_YEAR_RE = re.compile(r'(\d{4})\s+OK\s+AG')
+_DATE_MONTH_RE = re.compile(
+    r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),\s+(\d{4})'
+)
+_DATE_NUM_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_REQUESTOR_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'Question Submitted by:\s*([A-Z][^\n]+)',
+    r'Submitted by:\s*([A-Z][^\n]+)',
+    r'Requestor:\s*([A-Z][^\n]+)'
+)]
+# Common requestor titles, longest first so "Executive Director" wins over "Director"
+_REQUESTOR_TITLES = (
+    'State Representative',
+    'Executive Director',
+    'District Attorney',
+    'County Attorney',
+    'State Senator',
+    'Commissioner',
+    'Secretary',
+    'Chairman',
+    'Director'
+)
+_REQUESTOR_TITLE_RE = re.compile('|'.join(re.escape(title) for title in _REQUESTOR_TITLES))
+_TRAILING_COMMA_RE = re.compile(r',.*$')
+# Bounded so a match stays a plausible name (at most 91 characters)
+_ORGANIZATION_RE = re.compile(r'[A-Z][a-zA-Z\s]{0,80}(?:Commission|Department|Board|Authority)')
+_OKLAHOMA_ORGANIZATION_RE = re.compile(r'Oklahoma\s+[A-Z][a-zA-Z\s]{0,80}(?:Commission|Department|Board|Authority)')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+_SPACES_RE = re.compile(r' {2,}')  # Lone spaces are left alone rather than rewritten
+# Section bodies are capped (question < 1000 chars, conclusion < 2000), so a
+# heading with no terminator nearby fails after that many characters instead
+# of scanning on to the end of the opinion
+_QUESTION_RES = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+    r'QUESTION[:\s]+(.{1,999}?)(?:\n\n|CONCLUSION|OPINION)',
+    r'Question Presented[:\s]+(.{1,999}?)(?:\n\n|CONCLUSION|OPINION)'
+)]
+_CONCLUSION_RES = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+    r'CONCLUSION[:\s]+(.{1,1999}?)(?:\n\n[A-Z]+|$)',
+    r'(?:In conclusion|Therefore)[,:\s]+(.{1,1999}?)(?:\n\n|$)'
+)]
+# Citation forms are alternatives in one pattern, so the text is scanned once
+_STATUTE_CITATION_RE = re.compile(
+    r'\d+\s+O\.S\.(?:\s*§|\s+)\s*\d+(?:\.\d+)?'  # "43 O.S. § 109"
+    r'|Title\s+\d+,\s+Section\s+\d+(?:\.\d+)?'   # "Title 43, Section 109"
+)
+_CASE_CITATION_RE = re.compile(
+    r'\d{4}\s+OK\s+(?:CR\s+)?(?:AG\s+)?\d+'  # "2024 OK 123"
+    r'|\d+\s+P\.\d+d\s+\d+'                 # "562 P.3d 1085"
+)
+_DATE_FORMATS = ((_DATE_MONTH_RE, '%B %d, %Y'), (_DATE_NUM_RE, '%m/%d/%Y'))
+
+# Tags whose contents are not opinion text
+_NON_TEXT_TAGS = ['script', 'style', 'meta', 'link']
+
+# BeautifulSoup collapses whitespace-only strings outside these tags to a
+# single '\n' (or ' '); read_page does the same with selectolax so the
+# extracted text doesn't depend on which parser is installed
+_ASCII_SPACES = ' \n\t\f\r'
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+def _bs4_text(node) -> str:
+    """A selectolax text node's text, with whitespace-only runs collapsed as BS4 does"""
+    text = node.text(deep=False)
+    if text.strip(_ASCII_SPACES):
+        return text
+
+    parent = node.parent
+    while parent is not None:
+        if parent.tag in _PRESERVE_WHITESPACE_TAGS:
+            return text
+        parent = parent.parent
+    return '\n' if '\n' in text else ' '
+
+def read_page(html: str) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """
+    Parse an opinion page once for everything the extractors need
+
+    Returns:
+        (citation meta content, <title> text, the page's text nodes with
+        script/style/meta/link removed)
+    """
+    if SELECTOLAX_AVAILABLE:
+        tree = LexborHTMLParser(html)
+        meta = tree.css_first('meta[name="citation"]')
+        meta_citation = meta.attributes.get('content') if meta else None
+        title = tree.css_first('title')
+        title_text = title.text() if title else None
+        tree.strip_tags(_NON_TEXT_TAGS)
+        strings = [_bs4_text(node) for node in tree.root.traverse(include_text=True)
+                   if node.tag == '-text']
+        return meta_citation, title_text, strings
+
+    soup = make_soup(html)
+    meta = soup.find('meta', {'name': 'citation'})
+    meta_citation = meta.get('content') if meta else None
+    title = soup.find('title')
+    title_text = title.text if title else None
+    # .strings already skips <script>/<style> contents, so nothing is decomposed
+    return meta_citation, title_text, list(soup.strings)
 
 class AGOpinionParser:
     """Parse AG opinion HTML and extract structured data"""
@@ -29,29 +163,34 @@ class AGOpinionParser:
             Dictionary with opinion data, or None if parsing fails
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            meta_citation, title_text, strings = read_page(html)
+
+            # Page text, joined once and shared by the extractors below
+            page_text = ''.join(strings)
 
             # Extract citation from meta tags or page content
-            citation = self.extract_citation(soup)
+            citation = self.extract_citation(meta_citation, title_text, page_text)
             if not citation:
                 print(f"  WARNING: Could not extract citation for CiteID {cite_id}")
                 citation = f"CiteID {cite_id}"  # Fallback
 
+            opinion_date = self.extract_opinion_date(page_text)
+
             # Extract other fields
             opinion_data = {
                 'cite_id': cite_id,
                 'citation': citation,
-                'opinion_number': self.extract_opinion_number(soup, citation),
-                'opinion_date': self.extract_opinion_date(soup),
-                'opinion_year': self.extract_opinion_year(soup, citation),
-                'requestor_name': self.extract_requestor_name(soup),
-                'requestor_title': self.extract_requestor_title(soup),
-                'requestor_organization': self.extract_requestor_organization(soup),
-                'opinion_text': self.extract_opinion_text(soup),
-                'question_presented': self.extract_question_presented(soup),
-                'conclusion': self.extract_conclusion(soup),
-                'statutes_cited': self.extract_statute_citations(soup),
-                'cases_cited': self.extract_case_citations(soup),
+                'opinion_number': self.extract_opinion_number(citation),
+                'opinion_date': opinion_date,
+                'opinion_year': self.extract_opinion_year(citation, opinion_date),
+                'requestor_name': self.extract_requestor_name(page_text),
+                'requestor_title': self.extract_requestor_title(page_text),
+                'requestor_organization': self.extract_requestor_organization(page_text),
+                'opinion_text': self.extract_opinion_text(strings),
+                'question_presented': self.extract_question_presented(page_text),
+                'conclusion': self.extract_conclusion(page_text),
+                'statutes_cited': self.extract_statute_citations(page_text),
+                'cases_cited': self.extract_case_citations(page_text),
                 'oscn_url': f"https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID={cite_id}"
             }
 
@@ -61,231 +200,136 @@ class AGOpinionParser:
             print(f"  ERROR parsing CiteID {cite_id}: {e}")
             return None
 
-    def extract_citation(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_citation(self, meta_citation: Optional[str], title_text: Optional[str], text: str) -> Optional[str]:
         """Extract official citation (e.g., '2025 OK AG 3')"""
         # Try meta tag first
-        meta = soup.find('meta', {'name': 'citation'})
-        if meta and meta.get('content'):
-            return meta['content'].strip()
+        if meta_citation:
+            return meta_citation.strip()
 
         # Try to find in page title or header
-        title = soup.find('title')
-        if title:
+        if title_text:
             # Pattern: "2025 OK AG 3"
-            match = re.search(r'\d{4}\s+OK\s+AG\s+\d+', title.text)
+            match = _CITATION_RE.search(title_text)
             if match:
                 return match.group(0)
 
         # Look in page content for citation pattern
-        text = soup.get_text()
-        match = re.search(r'\d{4}\s+OK\s+AG\s+\d+', text)
+        match = _CITATION_RE.search(text)
         if match:
             return match.group(0)
 
         return None
 
-    def extract_opinion_number(self, soup: BeautifulSoup, citation: str) -> Optional[int]:
+    def extract_opinion_number(self, citation: str) -> Optional[int]:
         """Extract opinion number from citation"""
         if citation:
-            match = re.search(r'AG\s+(\d+)', citation)
+            match = _OPINION_NUMBER_RE.search(citation)
             if match:
                 return int(match.group(1))
         return None
 
-    def extract_opinion_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_opinion_date(self, text: str) -> Optional[str]:
         """Extract opinion date in YYYY-MM-DD format"""
-        text = soup.get_text()
-
         # Pattern: "January 14, 2025" or "01/14/2025"
-        date_patterns = [
-            r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),\s+(\d{4})',
-            r'(\d{1,2})/(\d{1,2})/(\d{4})'
-        ]
-
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
+        for pattern, date_format in _DATE_FORMATS:
+            match = pattern.search(text)
             if match:
                 try:
-                    if pattern == date_patterns[0]:  # Month name format
-                        month_name, day, year = match.groups()
-                        month_map = {
-                            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                            'September': 9, 'October': 10, 'November': 11, 'December': 12
-                        }
-                        month = month_map.get(month_name)
-                        if month:
-                            return f"{year}-{month:02d}-{int(day):02d}"
-                    else:  # MM/DD/YYYY format
-                        month, day, year = match.groups()
-                        return f"{year}-{int(month):02d}-{int(day):02d}"
-                except:
+                    return datetime.strptime(match.group(0), date_format).strftime('%Y-%m-%d')
+                except ValueError:  # e.g. "February 30, 2024"
                     continue
 
         return None
 
-    def extract_opinion_year(self, soup: BeautifulSoup, citation: str) -> Optional[int]:
-        """Extract opinion year from citation or date"""
+    def extract_opinion_year(self, citation: str, opinion_date: Optional[str]) -> Optional[int]:
+        """Extract opinion year from citation or the extracted opinion date"""
         if citation:
-            match = re.search(r'(\d{4})\s+OK\s+AG', citation)
+            match = _CITATION_YEAR_RE.search(citation)
             if match:
                 return int(match.group(1))
 
-        opinion_date = self.extract_opinion_date(soup)
         if opinion_date:
             return int(opinion_date.split('-')[0])
 
         return None
 
-    def extract_requestor_name(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_requestor_name(self, text: str) -> Optional[str]:
         """Extract requestor name"""
-        text = soup.get_text()
-
         # Look for "Question Submitted by:" or "Submitted by:"
-        patterns = [
-            r'Question Submitted by:\s*([A-Z][^\n]+)',
-            r'Submitted by:\s*([A-Z][^\n]+)',
-            r'Requestor:\s*([A-Z][^\n]+)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _REQUESTOR_RES:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 # Remove trailing commas or extra info
-                name = re.sub(r',.*$', '', name).strip()
+                name = _TRAILING_COMMA_RE.sub('', name).strip()
                 return name[:200]  # Limit length
 
         return None
 
-    def extract_requestor_title(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_requestor_title(self, text: str) -> Optional[str]:
         """Extract requestor title"""
-        text = soup.get_text()
-
-        # Common titles to look for
-        titles = [
-            'State Representative',
-            'State Senator',
-            'Commissioner',
-            'Director',
-            'Chairman',
-            'Secretary',
-            'Executive Director',
-            'County Attorney',
-            'District Attorney'
-        ]
-
-        for title in titles:
-            if title in text:
-                return title
+        match = _REQUESTOR_TITLE_RE.search(text)
+        if match:
+            return match.group(0)
 
         return None
 
-    def extract_requestor_organization(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_requestor_organization(self, text: str) -> Optional[str]:
         """Extract requestor organization"""
-        text = soup.get_text()
-
-        # Look for common organization patterns
-        patterns = [
-            r'Oklahoma\s+[A-Z][a-zA-Z\s]+(?:Commission|Department|Board|Authority)',
-            r'[A-Z][a-zA-Z\s]+(?:Commission|Department|Board|Authority)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                org = match.group(0).strip()
-                if len(org) < 100:  # Reasonable length
-                    return org
-
-        return None
+        # The general pattern matches every Oklahoma-prefixed name too, so
+        # when it misses (requestor is an individual) the text is scanned once
+        match = _ORGANIZATION_RE.search(text)
+        if not match:
+            return None
 
-    def extract_opinion_text(self, soup: BeautifulSoup) -> str:
-        """Extract full opinion text"""
-        # Remove script and style elements
-        for script in soup(['script', 'style', 'meta', 'link']):
-            script.decompose()
+        # Prefer an Oklahoma-prefixed name anywhere on the page
+        oklahoma_match = _OKLAHOMA_ORGANIZATION_RE.search(text)
+        return (oklahoma_match or match).group(0)
 
-        # Get text
-        text = soup.get_text(separator='\n', strip=True)
+    def extract_opinion_text(self, strings: List[str]) -> str:
+        """Extract full opinion text from the page's text nodes"""
+        # One line per non-blank text node
+        text = '\n'.join(line for line in (s.strip() for s in strings) if line)
 
         # Clean up excessive whitespace
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text)
+        text = _SPACES_RE.sub(' ', text)
 
         return text.strip()
 
-    def extract_question_presented(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_question_presented(self, text: str) -> Optional[str]:
         """Extract the question presented"""
-        text = soup.get_text()
-
         # Look for question section
-        patterns = [
-            r'QUESTION[:\s]+(.+?)(?:\n\n|CONCLUSION|OPINION)',
-            r'Question Presented[:\s]+(.+?)(?:\n\n|CONCLUSION|OPINION)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        for pattern in _QUESTION_RES:
+            match = pattern.search(text)
             if match:
-                question = match.group(1).strip()
-                # Limit length
-                if len(question) < 1000:
-                    return question
+                return match.group(1).strip()
 
         return None
 
-    def extract_conclusion(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_conclusion(self, text: str) -> Optional[str]:
         """Extract conclusion"""
-        text = soup.get_text()
-
         # Look for conclusion section
-        patterns = [
-            r'CONCLUSION[:\s]+(.+?)(?:\n\n[A-Z]+|$)',
-            r'(?:In conclusion|Therefore)[,:\s]+(.+?)(?:\n\n|$)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        for pattern in _CONCLUSION_RES:
+            match = pattern.search(text)
             if match:
-                conclusion = match.group(1).strip()
-                # Limit length
-                if len(conclusion) < 2000:
-                    return conclusion
+                return match.group(1).strip()
 
         return None
 
-    def extract_statute_citations(self, soup: BeautifulSoup) -> List[str]:
+    def extract_statute_citations(self, text: str) -> List[str]:
         """Extract citations to Oklahoma statutes"""
-        text = soup.get_text()
-
         # Pattern: "43 O.S. § 109" or "Title 43, Section 109"
-        patterns = [
-            r'\d+\s+O\.S\.(?:\s*§|\s+)\s*\d+(?:\.\d+)?',
-            r'Title\s+\d+,\s+Section\s+\d+(?:\.\d+)?'
-        ]
-
-        citations = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            citations.update(matches)
+        # First occurrence of each, in the order they appear
+        citations = dict.fromkeys(_STATUTE_CITATION_RE.findall(text))
 
         return list(citations)[:50]  # Limit to 50 citations
 
-    def extract_case_citations(self, soup: BeautifulSoup) -> List[str]:
+    def extract_case_citations(self, text: str) -> List[str]:
         """Extract citations to other cases"""
-        text = soup.get_text()
-
         # Pattern: "2024 OK 123" or "562 P.3d 1085"
-        patterns = [
-            r'\d{4}\s+OK\s+(?:CR\s+)?(?:AG\s+)?\d+',
-            r'\d+\s+P\.\d+d\s+\d+'
-        ]
-
-        citations = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            citations.update(matches)
+        # First occurrence of each, in the order they appear
+        citations = dict.fromkeys(_CASE_CITATION_RE.findall(text))
 
         return list(citations)[:100]  # Limit to 100 citations
 
@@ -299,12 +343,19 @@ class AGOpinionScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (Oklahoma Legal Research Bot - Educational Purpose)'
         })
+        # Keep-alive connections shared by the scrape workers
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SCRAPE_WORKERS, max_retries=FETCH_RETRY_POLICY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
         # Initialize Supabase
         self.supabase = create_client(supabase_url, supabase_key)
 
-        self.rate_limit_delay = 2  # seconds between requests
-        self.batch_size = 10  # Insert in batches
+        self.rate_limit_delay = 2  # seconds between one worker's requests
+        # Shared by the scrape workers, so requests start rate_limit_delay /
+        # SCRAPE_WORKERS (0.5s) apart however many run at once
+        self.rate_limiter = RateLimiter(self.rate_limit_delay / SCRAPE_WORKERS)
+        self.batch_size = 500  # Rows per upsert request
 
     def scrape_opinion(self, cite_id: str) -> Optional[Dict]:
         """
@@ -318,6 +369,8 @@ class AGOpinionScraper:
         """
         url = f"https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID={cite_id}"
 
+        self.rate_limiter.wait()
+
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
@@ -330,48 +383,75 @@ class AGOpinionScraper:
             print(f"  ERROR fetching CiteID {cite_id}: {e}")
             return None
 
+    def iter_scraped_opinions(self, cite_ids: List[str]) -> Iterator[Tuple[str, Future]]:
+        """
+        Scrape opinions concurrently (rate limited by self.rate_limiter)
+
+        Yields (cite_id, future) in input order; future.result() is the
+        scrape_opinion result (or raises what it raised).
+        """
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as executor:
+            try:
+                # Sliding window: keep SCRAPE_CHUNK_SIZE pages queued so the
+                # workers never wait on the caller between results
+                pending = deque()
+                for cite_id in cite_ids:
+                    pending.append((cite_id, executor.submit(self.scrape_opinion, cite_id)))
+                    if len(pending) >= SCRAPE_CHUNK_SIZE:
+                        yield pending.popleft()
+
+                yield from pending
+            finally:
+                # If the caller stops early (e.g. Ctrl-C closes the generator),
+                # drop the queued pages instead of fetching them all first
+                executor.shutdown(cancel_futures=True)
+
     def scrape_opinions_batch(self, cite_ids: List[str]) -> List[Dict]:
         """Scrape multiple opinions with rate limiting"""
         opinions = []
 
-        for i, cite_id in enumerate(cite_ids):
-            print(f"  Scraping {i+1}/{len(cite_ids)}: CiteID {cite_id}")
+        for i, (cite_id, future) in enumerate(self.iter_scraped_opinions(cite_ids)):
+            print(f"  Scraped {i+1}/{len(cite_ids)}: CiteID {cite_id}")
 
-            opinion_data = self.scrape_opinion(cite_id)
+            opinion_data = future.result()
 
             if opinion_data:
                 opinions.append(opinion_data)
 
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
-
         return opinions
 
-    def store_opinions(self, opinions: List[Dict]) -> int:
+    def store_opinions(self, opinions: List[Dict]) -> Set[str]:
         """
         Store AG opinions in Supabase
 
         Returns:
-            Number of opinions successfully stored
+            cite_ids of the opinions successfully stored
         """
+        stored = set()
         if not opinions:
-            return 0
-
-        stored_count = 0
+            return stored
 
-        # Insert in batches
+        # Upsert in batches - keyed on cite_id, so re-running a batch is harmless
+        table = self.supabase.table('attorney_general_opinions')
         for i in range(0, len(opinions), self.batch_size):
             batch = opinions[i:i + self.batch_size]
 
             try:
-                result = self.supabase.table('attorney_general_opinions').insert(batch).execute()
-                stored_count += len(batch)
-                print(f"  Stored batch: {stored_count}/{len(opinions)} opinions")
+                table.upsert(batch, on_conflict='cite_id').execute()
+                stored.update(opinion['cite_id'] for opinion in batch)
+                print(f"  Stored batch: {len(stored)}/{len(opinions)} opinions")
 
             except Exception as e:
-                print(f"  ERROR storing batch: {e}")
-
-        return stored_count
+                # One bad row fails the whole request; retry row by row to isolate it
+                print(f"  ERROR storing batch: {e} - retrying one at a time")
+                for opinion in batch:
+                    try:
+                        table.upsert(opinion, on_conflict='cite_id').execute()
+                        stored.add(opinion['cite_id'])
+                    except Exception as row_error:
+                        print(f"  ERROR storing CiteID {opinion['cite_id']}: {row_error}")
+
+        return stored
 
 
 def main():
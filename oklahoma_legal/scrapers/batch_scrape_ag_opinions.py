@@ -4,10 +4,9 @@ Batch AG Opinion Scraper
 Scrapes all discovered AG opinions and stores them in Supabase
 """
 
-import json
-import time
 import os
 import sys
+from contextlib import closing
 from datetime import datetime
 from typing import Dict, List, Set
 
@@ -16,6 +15,7 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
 from scrapers.ag_opinion_scraper import AGOpinionScraper
+from scrapers.scraper_utils import load_json, save_json
 
 class BatchAGOpinionScraper:
     """Batch scrape all discovered AG opinions"""
@@ -23,34 +23,70 @@ class BatchAGOpinionScraper:
     def __init__(self, supabase_url: str, supabase_key: str):
         self.scraper = AGOpinionScraper(supabase_url, supabase_key)
         self.progress_file = "ag_scraping_progress.json"
+        # Stored cite_ids, one per line, appended as each batch is stored
+        self.progress_log = "ag_scraping_progress.ndjson"
         self.scraped_cite_ids: Set[str] = set()
-        self.failed_cite_ids: List[Dict] = []
+        # cite_id -> error message, so a cite_id that fails again replaces its entry
+        self.failed_cite_ids: Dict[str, str] = {}
+        self.progress_fh = open(self.progress_log, 'a', buffering=1)
         self.load_progress()
 
     def load_progress(self):
         """Load progress from previous run if exists"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r') as f:
-                    data = json.load(f)
-                    self.scraped_cite_ids = set(data.get('scraped', []))
-                    self.failed_cite_ids = data.get('failed', [])
-                    print(f"[RESUME] Loaded progress: {len(self.scraped_cite_ids)} already scraped")
-            except Exception as e:
-                print(f"[WARNING] Could not load progress: {e}")
+        try:
+            with open(self.progress_log, 'r') as f:
+                self.scraped_cite_ids.update(line.strip() for line in f if line.strip())
+
+            if os.path.exists(self.progress_file):
+                data = load_json(self.progress_file)
+                failed = data.get('failed', {})
+                if isinstance(failed, list):  # Older progress files kept a list of entries
+                    failed = {entry['cite_id']: entry['error'] for entry in failed}
+                # Progress files from before the log list scraped cite_ids here;
+                # move the ones not already logged to the log, since
+                # save_progress no longer writes them
+                self.log_scraped(data.get('scraped', []))
+                # Entries for cite_ids stored since they failed are stale
+                self.failed_cite_ids = {cite_id: failure for cite_id, failure in failed.items()
+                                        if cite_id not in self.scraped_cite_ids}
+
+            if self.scraped_cite_ids:
+                print(f"[RESUME] Loaded progress: {len(self.scraped_cite_ids)} already scraped")
+        except Exception as e:
+            print(f"[WARNING] Could not load progress: {e}")
+
+    def log_scraped(self, cite_ids):
+        """Mark cite_ids as done, appending them to the progress log"""
+        new_ids = [cite_id for cite_id in cite_ids if cite_id not in self.scraped_cite_ids]
+        if new_ids:
+            self.progress_fh.write(''.join(f"{cite_id}\n" for cite_id in new_ids))
+            self.scraped_cite_ids.update(new_ids)
+            # A cite_id that failed on an earlier run and has now been stored is no longer a failure
+            for cite_id in new_ids:
+                self.failed_cite_ids.pop(cite_id, None)
 
     def save_progress(self):
-        """Save current progress"""
+        """Sync the progress log and save the failed list"""
         try:
-            with open(self.progress_file, 'w') as f:
-                json.dump({
-                    'scraped': list(self.scraped_cite_ids),
-                    'failed': self.failed_cite_ids,
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
+            self.progress_fh.flush()
+            os.fsync(self.progress_fh.fileno())
+
+            # Write to a temporary file and swap it in, so an interrupted
+            # save never leaves a truncated progress file behind
+            tmp_file = self.progress_file + '.tmp'
+            save_json(tmp_file, {
+                'failed': self.failed_cite_ids,
+                'last_updated': datetime.now().isoformat()
+            })
+            os.replace(tmp_file, self.progress_file)
         except Exception as e:
             print(f"[WARNING] Could not save progress: {e}")
 
+    def close(self):
+        """Save progress and close the progress log"""
+        self.save_progress()
+        self.progress_fh.close()
+
     def scrape_all_opinions(self, discovered_opinions_file: str = "discovered_ag_opinions.json"):
         """
         Scrape all AG opinions from discovery file
@@ -63,8 +99,7 @@ class BatchAGOpinionScraper:
         print("Oklahoma AG Opinion Batch Scraper")
         print("="*60)
 
-        with open(discovered_opinions_file, 'r') as f:
-            discovered_data = json.load(f)
+        discovered_data = load_json(discovered_opinions_file)
 
         cite_ids = discovered_data['cite_ids']
 
@@ -90,51 +125,38 @@ class BatchAGOpinionScraper:
         print(f"\nOpinions to scrape: {len(remaining_cite_ids)}/{len(cite_ids)}\n")
 
         batch = []
-        batch_size = 10  # Store in batches
-
-        for i, cite_id in enumerate(remaining_cite_ids):
-            print(f"  [{i+1}/{len(remaining_cite_ids)}] Scraping CiteID {cite_id}...", end=' ')
-
-            try:
-                opinion_data = self.scraper.scrape_opinion(cite_id)
-
-                if opinion_data:
-                    batch.append(opinion_data)
-                    self.scraped_cite_ids.add(cite_id)
-                    print(f"OK - {opinion_data['citation']}")
-                else:
-                    print("FAILED - No data returned")
-                    self.failed_cite_ids.append({
-                        'cite_id': cite_id,
-                        'error': 'No data returned'
-                    })
-
-                # Store batch when full
-                if len(batch) >= batch_size:
-                    self.store_batch(batch)
-                    batch = []
-
-                # Save progress periodically
-                if (i + 1) % 20 == 0:
-                    self.save_progress()
-
-            except Exception as e:
-                print(f"ERROR - {e}")
-                self.failed_cite_ids.append({
-                    'cite_id': cite_id,
-                    'error': str(e)
-                })
-
-            # Rate limiting
-            time.sleep(self.scraper.rate_limit_delay)
-
-        # Store remaining batch
+        batch_size = self.scraper.batch_size  # Rows per Supabase upsert
+
+        # Fetched concurrently by the scraper; results arrive in order.
+        # Closing the generator on the way out (e.g. Ctrl-C) cancels the
+        # fetches still queued
+        with closing(self.scraper.iter_scraped_opinions(remaining_cite_ids)) as scraped:
+            for i, (cite_id, future) in enumerate(scraped):
+                print(f"  [{i+1}/{len(remaining_cite_ids)}] Scraped CiteID {cite_id}...", end=' ')
+
+                try:
+                    opinion_data = future.result()
+
+                    if opinion_data:
+                        batch.append(opinion_data)
+                        print(f"OK - {opinion_data['citation']}")
+                    else:
+                        print("FAILED - No data returned")
+                        self.failed_cite_ids[cite_id] = 'No data returned'
+
+                    # Store batch when full
+                    if len(batch) >= batch_size:
+                        self.store_batch(batch)
+                        batch = []
+
+                except Exception as e:
+                    print(f"ERROR - {e}")
+                    self.failed_cite_ids[cite_id] = str(e)
+
+        # Store remaining batch (progress is saved by close())
         if batch:
             self.store_batch(batch)
 
-        # Save final progress
-        self.save_progress()
-
         # Print summary
         self.print_summary()
 
@@ -145,15 +167,17 @@ class BatchAGOpinionScraper:
 
         try:
             stored = self.scraper.store_opinions(batch)
-            print(f"\n  [STORED] {stored} opinions saved to Supabase")
+            print(f"\n  [STORED] {len(stored)} opinions saved to Supabase")
+            # Only stored rows count as done, so a resumed run re-scrapes the rest
+            self.log_scraped(opinion['cite_id'] for opinion in batch if opinion['cite_id'] in stored)
+            for opinion in batch:
+                if opinion['cite_id'] not in stored:
+                    self.failed_cite_ids[opinion['cite_id']] = 'Storage failed'
         except Exception as e:
             print(f"\n  [ERROR] Failed to store batch: {e}")
             # Mark all opinions in batch as failed
             for opinion in batch:
-                self.failed_cite_ids.append({
-                    'cite_id': opinion['cite_id'],
-                    'error': f'Storage failed: {e}'
-                })
+                self.failed_cite_ids[opinion['cite_id']] = f'Storage failed: {e}'
 
     def print_summary(self):
         """Print final scraping summary"""
@@ -167,8 +191,7 @@ class BatchAGOpinionScraper:
 
         if self.failed_cite_ids:
             print(f"\nFailed opinions saved to: ag_scraping_failures.json")
-            with open('ag_scraping_failures.json', 'w') as f:
-                json.dump(self.failed_cite_ids, f, indent=2)
+            save_json('ag_scraping_failures.json', self.failed_cite_ids)
 
         print("="*60)
 
@@ -197,8 +220,11 @@ def main():
     # Initialize batch scraper
     batch_scraper = BatchAGOpinionScraper(supabase_url, supabase_key)
 
-    # Run scraping
-    batch_scraper.scrape_all_opinions()
+    # Run scraping; progress is saved even if the run is interrupted (e.g. Ctrl-C)
+    try:
+        batch_scraper.scrape_all_opinions()
+    finally:
+        batch_scraper.close()
 
 
 if __name__ == "__main__":
@@ -4,12 +4,18 @@ Batch Case Law Scraper
 Scrapes all discovered cases and stores them in Supabase
 """
 
-import json
-import time
 import os
 import sys
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Set, Tuple
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    # Falls back to loading the whole discovery file with json
+    IJSON_AVAILABLE = False
 
 # Add parent directory to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,6 +23,7 @@ sys.path.insert(0, parent_dir)
 
 # Import from same directory
 from scrapers.case_law_scraper import CaseLawScraper
+from scrapers.scraper_utils import load_json, save_json
 
 class BatchCaseScraper:
     """Batch scrape all discovered cases"""
@@ -24,34 +31,70 @@ class BatchCaseScraper:
     def __init__(self, supabase_url: str, supabase_key: str):
         self.scraper = CaseLawScraper(supabase_url, supabase_key)
         self.progress_file = "scraping_progress.json"
+        # Stored cite_ids, one per line, appended as each batch is stored
+        self.progress_log = "scraping_progress.ndjson"
         self.scraped_cite_ids: Set[str] = set()
-        self.failed_cite_ids: List[Dict] = []
+        # cite_id -> {'court', 'error'}, so a cite_id that fails again replaces its entry
+        self.failed_cite_ids: Dict[str, Dict] = {}
+        self.progress_fh = open(self.progress_log, 'a', buffering=1)
         self.load_progress()
 
     def load_progress(self):
         """Load progress from previous run if exists"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r') as f:
-                    data = json.load(f)
-                    self.scraped_cite_ids = set(data.get('scraped', []))
-                    self.failed_cite_ids = data.get('failed', [])
-                    print(f"[RESUME] Loaded progress: {len(self.scraped_cite_ids)} already scraped")
-            except Exception as e:
-                print(f"[WARNING] Could not load progress: {e}")
+        try:
+            with open(self.progress_log, 'r') as f:
+                self.scraped_cite_ids.update(line.strip() for line in f if line.strip())
+
+            if os.path.exists(self.progress_file):
+                data = load_json(self.progress_file)
+                failed = data.get('failed', {})
+                if isinstance(failed, list):  # Older progress files kept a list of entries
+                    failed = {entry['cite_id']: {'court': entry['court'], 'error': entry['error']} for entry in failed}
+                # Progress files from before the log list scraped cite_ids here;
+                # move the ones not already logged to the log, since
+                # save_progress no longer writes them
+                self.log_scraped(data.get('scraped', []))
+                # Entries for cite_ids stored since they failed are stale
+                self.failed_cite_ids = {cite_id: failure for cite_id, failure in failed.items()
+                                        if cite_id not in self.scraped_cite_ids}
+
+            if self.scraped_cite_ids:
+                print(f"[RESUME] Loaded progress: {len(self.scraped_cite_ids)} already scraped")
+        except Exception as e:
+            print(f"[WARNING] Could not load progress: {e}")
+
+    def log_scraped(self, cite_ids):
+        """Mark cite_ids as done, appending them to the progress log"""
+        new_ids = [cite_id for cite_id in cite_ids if cite_id not in self.scraped_cite_ids]
+        if new_ids:
+            self.progress_fh.write(''.join(f"{cite_id}\n" for cite_id in new_ids))
+            self.scraped_cite_ids.update(new_ids)
+            # A cite_id that failed on an earlier run and has now been stored is no longer a failure
+            for cite_id in new_ids:
+                self.failed_cite_ids.pop(cite_id, None)
 
     def save_progress(self):
-        """Save current progress"""
+        """Sync the progress log and save the failed list"""
         try:
-            with open(self.progress_file, 'w') as f:
-                json.dump({
-                    'scraped': list(self.scraped_cite_ids),
-                    'failed': self.failed_cite_ids,
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
+            self.progress_fh.flush()
+            os.fsync(self.progress_fh.fileno())
+
+            # Write to a temporary file and swap it in, so an interrupted
+            # save never leaves a truncated progress file behind
+            tmp_file = self.progress_file + '.tmp'
+            save_json(tmp_file, {
+                'failed': self.failed_cite_ids,
+                'last_updated': datetime.now().isoformat()
+            })
+            os.replace(tmp_file, self.progress_file)
         except Exception as e:
             print(f"[WARNING] Could not save progress: {e}")
 
+    def close(self):
+        """Save progress and close the progress log"""
+        self.save_progress()
+        self.progress_fh.close()
+
     def scrape_all_cases(self, discovered_cases_file: str = "discovered_cases.json"):
         """
         Scrape all cases from discovery file
@@ -64,29 +107,42 @@ class BatchCaseScraper:
         print("Oklahoma Case Law Batch Scraper")
         print("="*60)
 
-        with open(discovered_cases_file, 'r') as f:
-            discovered_data = json.load(f)
-
-        cases_by_court = discovered_data['cases_by_court']
-
-        # Count total cases
-        total_cases = sum(len(cite_ids) for cite_ids in cases_by_court.values())
-        already_scraped = len(self.scraped_cite_ids)
-        remaining = total_cases - already_scraped
-
-        print(f"\nTotal cases to scrape: {total_cases:,}")
-        print(f"Already scraped: {already_scraped:,}")
-        print(f"Remaining: {remaining:,}")
-        print(f"Estimated time: {remaining * 2 / 60:.0f}-{remaining * 3 / 60:.0f} minutes")
-        print("="*60)
+        if IJSON_AVAILABLE:
+            # Stream the courts one at a time rather than loading every
+            # cite_id up front; total_cases is written ahead of
+            # cases_by_court, so reading it only touches the file's head
+            with open(discovered_cases_file, 'rb') as f:
+                total_cases = next(ijson.items(f, 'total_cases'), None)
+            courts = self.iter_discovered_courts(discovered_cases_file)
+        else:
+            cases_by_court = load_json(discovered_cases_file)['cases_by_court']
+            total_cases = sum(len(cite_ids) for cite_ids in cases_by_court.values())
+            courts = cases_by_court.items()
+
+        # Count total cases (older discovery files don't record the total)
+        if total_cases is not None:
+            already_scraped = len(self.scraped_cite_ids)
+            remaining = total_cases - already_scraped
+
+            print(f"\nTotal cases to scrape: {total_cases:,}")
+            print(f"Already scraped: {already_scraped:,}")
+            print(f"Remaining: {remaining:,}")
+            print(f"Estimated time: {remaining * 2 / 60:.0f}-{remaining * 3 / 60:.0f} minutes")
+            print("="*60)
 
         # Scrape each court
-        for court_name, cite_ids in cases_by_court.items():
+        for court_name, cite_ids in courts:
             self.scrape_court_cases(court_name, cite_ids)
 
         # Final summary
         self.print_summary()
 
+    @staticmethod
+    def iter_discovered_courts(discovered_cases_file: str) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (court_name, cite_ids) from a discovery file, one court at a time"""
+        with open(discovered_cases_file, 'rb') as f:
+            yield from ijson.kvitems(f, 'cases_by_court')
+
     def scrape_court_cases(self, court_name: str, cite_ids: List[str]):
         """Scrape all cases for a specific court"""
         print(f"\n{'='*60}")
@@ -112,45 +168,39 @@ class BatchCaseScraper:
         print(f"Cases to scrape: {len(remaining_cite_ids)}/{len(cite_ids)}")
 
         batch = []
-        batch_size = 10  # Store in batches
-
-        for i, cite_id in enumerate(remaining_cite_ids):
-            print(f"  [{i+1}/{len(remaining_cite_ids)}] Scraping CiteID {cite_id}...", end=' ')
-
-            try:
-                case_data = self.scraper.scrape_case(cite_id, court_type, court_db)
-
-                if case_data:
-                    batch.append(case_data)
-                    self.scraped_cite_ids.add(cite_id)
-                    print(f"OK - {case_data['citation']}")
-                else:
-                    print("FAILED - No data returned")
-                    self.failed_cite_ids.append({
-                        'cite_id': cite_id,
+        batch_size = self.scraper.batch_size  # Rows per Supabase upsert
+
+        # Fetched concurrently by the scraper; results arrive in order.
+        # Closing the generator on the way out (e.g. Ctrl-C) cancels the
+        # fetches still queued
+        with closing(self.scraper.iter_scraped_cases(remaining_cite_ids, court_type, court_db)) as scraped:
+            for i, (cite_id, future) in enumerate(scraped):
+                print(f"  [{i+1}/{len(remaining_cite_ids)}] Scraped CiteID {cite_id}...", end=' ')
+
+                try:
+                    case_data = future.result()
+
+                    if case_data:
+                        batch.append(case_data)
+                        print(f"OK - {case_data['citation']}")
+                    else:
+                        print("FAILED - No data returned")
+                        self.failed_cite_ids[cite_id] = {
+                            'court': court_name,
+                            'error': 'No data returned'
+                        }
+
+                    # Store batch when full
+                    if len(batch) >= batch_size:
+                        self.store_batch(batch)
+                        batch = []
+
+                except Exception as e:
+                    print(f"ERROR - {e}")
+                    self.failed_cite_ids[cite_id] = {
                         'court': court_name,
-                        'error': 'No data returned'
-                    })
-
-                # Store batch when full
-                if len(batch) >= batch_size:
-                    self.store_batch(batch)
-                    batch = []
-
-                # Save progress periodically
-                if (i + 1) % 50 == 0:
-                    self.save_progress()
-
-            except Exception as e:
-                print(f"ERROR - {e}")
-                self.failed_cite_ids.append({
-                    'cite_id': cite_id,
-                    'court': court_name,
-                    'error': str(e)
-                })
-
-            # Rate limiting
-            time.sleep(self.scraper.rate_limit_delay)
+                        'error': str(e)
+                    }
 
         # Store remaining batch
         if batch:
@@ -168,16 +218,23 @@ class BatchCaseScraper:
 
         try:
             stored = self.scraper.store_cases(batch)
-            print(f"\n  [STORED] {stored} cases saved to Supabase")
+            print(f"\n  [STORED] {len(stored)} cases saved to Supabase")
+            # Only stored rows count as done, so a resumed run re-scrapes the rest
+            self.log_scraped(case['cite_id'] for case in batch if case['cite_id'] in stored)
+            for case in batch:
+                if case['cite_id'] not in stored:
+                    self.failed_cite_ids[case['cite_id']] = {
+                        'court': case['court_type'],
+                        'error': 'Storage failed'
+                    }
         except Exception as e:
             print(f"\n  [ERROR] Failed to store batch: {e}")
             # Mark all cases in batch as failed
             for case in batch:
-                self.failed_cite_ids.append({
-                    'cite_id': case['cite_id'],
+                self.failed_cite_ids[case['cite_id']] = {
                     'court': case['court_type'],
                     'error': f'Storage failed: {e}'
-                })
+                }
 
     def print_summary(self):
         """Print final scraping summary"""
@@ -190,8 +247,7 @@ class BatchCaseScraper:
 
         if self.failed_cite_ids:
             print(f"\nFailed cases saved to: scraping_failures.json")
-            with open('scraping_failures.json', 'w') as f:
-                json.dump(self.failed_cite_ids, f, indent=2)
+            save_json('scraping_failures.json', self.failed_cite_ids)
 
         print("="*60)
 
@@ -220,8 +276,11 @@ def main():
     # Initialize batch scraper
     batch_scraper = BatchCaseScraper(supabase_url, supabase_key)
 
-    # Run scraping
-    batch_scraper.scrape_all_cases()
+    # Run scraping; progress is saved even if the run is interrupted (e.g. Ctrl-C)
+    try:
+        batch_scraper.scrape_all_cases()
+    finally:
+        batch_scraper.close()
 
 
 if __name__ == "__main__":
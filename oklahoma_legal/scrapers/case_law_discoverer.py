@@ -12,6 +12,10 @@ import json
 import re
 from datetime import datetime
 
+# Document links: DeliverDocument.asp?CiteID=XXXXX
+_CITEID_RE = re.compile(r'DeliverDocument\.asp\?CiteID=(\d+)', re.IGNORECASE)
+_PAGE_NUMBER_RE = re.compile(r'^\d+$')
+
 class CaseLawDiscoverer:
     """Discover all case CiteIDs from OSCN"""
 
@@ -182,7 +186,7 @@ class CaseLawDiscoverer:
             text = link.get_text().strip().lower()
 
             # Check if this is a pagination link
-            if 'next' in text or 'page' in text or re.match(r'^\d+$', text):
+            if 'next' in text or 'page' in text or _PAGE_NUMBER_RE.match(text):
                 if 'Index.asp' in href or 'Search.asp' in href:
                     try:
                         # Extract pagination parameters
@@ -215,7 +219,7 @@ class CaseLawDiscoverer:
             href = link['href']
 
             # Match pattern: DeliverDocument.asp?CiteID=XXXXX
-            match = re.search(r'DeliverDocument\.asp\?CiteID=(\d+)', href, re.IGNORECASE)
+            match = _CITEID_RE.search(href)
             if match:
                 cite_id = match.group(1)
                 cite_ids.add(cite_id)
@@ -5,14 +5,58 @@ Scrapes individual case pages and extracts structured data
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import re
 from datetime import datetime
 from supabase import create_client
 import os
+import sys
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from scrapers.scraper_utils import RateLimiter
+
+# Pages fetched concurrently; requests start rate_limit_delay / SCRAPE_WORKERS
+# apart, and at most SCRAPE_CHUNK_SIZE pages are queued ahead of the caller
+SCRAPE_WORKERS = 4
+SCRAPE_CHUNK_SIZE = 50
+
+# Timeouts, connection errors, 429s and 5xx responses are retried by urllib3
+# with exponential backoff (honoring Retry-After) before scrape_* gives up
+FETCH_RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET']
+)
+
+# Decision date patterns and the strptime format for each
+_DATE_FORMATS = (
+    (re.compile(
+        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),\s+(\d{4})'
+    ), '%B %d, %Y'),
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), '%m/%d/%Y')
+)
+_CITATION_YEAR_RE = re.compile(r'(\d{4})\s+OK')
+# Citation forms are alternatives in one pattern, so the text is scanned once
+_STATUTE_CITATION_RE = re.compile(
+    r'\d+\s+O\.S\.(?:\s*§|\s+)\s*\d+(?:\.\d+)?'  # "43 O.S. § 109"
+    r'|Title\s+\d+,\s+Section\s+\d+(?:\.\d+)?'   # "Title 43, Section 109"
+)
+_CASE_CITATION_RE = re.compile(
+    r'\d{4}\s+OK\s+(?:CR\s+)?\d+'  # "2024 OK 123"
+    r'|\d+\s+P\.\d+d\s+\d+'       # "562 P.3d 1085"
+)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+_SPACES_RE = re.compile(r' {2,}')  # Lone spaces are left alone rather than rewritten
 
 class CaseLawParser:
     """Parse case HTML and extract structured data"""
@@ -33,35 +77,42 @@ class CaseLawParser:
         try:
             soup = BeautifulSoup(html, 'html.parser')
 
+            # Page text, extracted once and shared by the extractors below
+            # instead of each one walking the whole tree again
+            text = soup.get_text()
+            lower_text = text.lower()
+
             # Extract citation from meta tags or page content
-            citation = self.extract_citation(soup)
+            citation = self.extract_citation(soup, text)
             if not citation:
                 print(f"  WARNING: Could not extract citation for CiteID {cite_id}")
                 citation = f"CiteID {cite_id}"  # Fallback
 
+            decision_date = self.extract_decision_date(text)
+
             # Extract other fields
             case_data = {
                 'cite_id': cite_id,
                 'citation': citation,
-                'case_number': self.extract_case_number(soup),
+                'case_number': self.extract_case_number(text),
                 'court_type': court_type,
                 'court_database': court_database,
-                'decision_date': self.extract_decision_date(soup),
-                'decision_year': self.extract_decision_year(soup),
-                'case_title': self.extract_case_title(soup),
-                'appellant': self.extract_party(soup, 'appellant'),
-                'appellee': self.extract_party(soup, 'appellee'),
+                'decision_date': decision_date,
+                'decision_year': self.extract_decision_year(citation, decision_date),
+                'case_title': self.extract_case_title(soup, text),
+                'appellant': self.extract_party(text, 'appellant'),
+                'appellee': self.extract_party(text, 'appellee'),
                 'other_parties': self.extract_other_parties(soup),
-                'authoring_judge': self.extract_authoring_judge(soup),
+                'authoring_judge': self.extract_authoring_judge(text),
                 'concurring_judges': self.extract_judges(soup, 'concurring'),
                 'dissenting_judges': self.extract_judges(soup, 'dissenting'),
                 'opinion_text': self.extract_opinion_text(soup),
-                'syllabus': self.extract_syllabus(soup),
+                'syllabus': self.extract_syllabus(text),
                 'holdings': self.extract_holdings(soup),
-                'opinion_type': self.extract_opinion_type(soup),
-                'procedural_posture': self.extract_procedural_posture(soup),
-                'statutes_cited': self.extract_statute_citations(soup),
-                'cases_cited': self.extract_case_citations(soup),
+                'opinion_type': self.extract_opinion_type(lower_text),
+                'procedural_posture': self.extract_procedural_posture(lower_text),
+                'statutes_cited': self.extract_statute_citations(text),
+                'cases_cited': self.extract_case_citations(text),
                 'oscn_url': f"https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID={cite_id}"
             }
 
@@ -71,7 +122,7 @@ class CaseLawParser:
             print(f"  ERROR parsing CiteID {cite_id}: {e}")
             return None
 
-    def extract_citation(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_citation(self, soup: BeautifulSoup, text: str) -> Optional[str]:
         """Extract official citation (e.g., '2025 OK 2, 562 P.3d 1085')"""
         # Try meta tag first
         meta = soup.find('meta', {'name': 'citation'})
@@ -87,17 +138,15 @@ class CaseLawParser:
                 return match.group(0)
 
         # Look in page content for citation pattern
-        text = soup.get_text()
         match = re.search(r'\d{4}\s+OK\s+\d+,?\s+\d+\s+P\.\d+d\s+\d+', text)
         if match:
             return match.group(0)
 
         return None
 
-    def extract_case_number(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_case_number(self, text: str) -> Optional[str]:
         """Extract docket/case number"""
         # Look for "Case No." or "No." patterns
-        text = soup.get_text()
         patterns = [
             r'Case\s+No\.?\s*(\d+)',
             r'No\.?\s+(\d+)',
@@ -111,53 +160,32 @@ class CaseLawParser:
 
         return None
 
-    def extract_decision_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_decision_date(self, text: str) -> Optional[str]:
         """Extract decision date in YYYY-MM-DD format"""
-        text = soup.get_text()
-
         # Pattern: "January 14, 2025" or "01/14/2025"
-        date_patterns = [
-            r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),\s+(\d{4})',
-            r'(\d{1,2})/(\d{1,2})/(\d{4})'
-        ]
-
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
+        for pattern, date_format in _DATE_FORMATS:
+            match = pattern.search(text)
             if match:
                 try:
-                    if pattern == date_patterns[0]:  # Month name format
-                        month_name, day, year = match.groups()
-                        month_map = {
-                            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                            'September': 9, 'October': 10, 'November': 11, 'December': 12
-                        }
-                        month = month_map.get(month_name)
-                        if month:
-                            return f"{year}-{month:02d}-{int(day):02d}"
-                    else:  # MM/DD/YYYY format
-                        month, day, year = match.groups()
-                        return f"{year}-{int(month):02d}-{int(day):02d}"
-                except:
+                    return datetime.strptime(match.group(0), date_format).strftime('%Y-%m-%d')
+                except ValueError:  # e.g. "February 30, 2024"
                     continue
 
         return None
 
-    def extract_decision_year(self, soup: BeautifulSoup) -> Optional[int]:
-        """Extract decision year from citation or date"""
-        citation = self.extract_citation(soup)
+    def extract_decision_year(self, citation: str, decision_date: Optional[str]) -> Optional[int]:
+        """Extract decision year from citation or the extracted decision date"""
         if citation:
-            match = re.search(r'(\d{4})\s+OK', citation)
+            match = _CITATION_YEAR_RE.search(citation)
             if match:
                 return int(match.group(1))
 
-        decision_date = self.extract_decision_date(soup)
         if decision_date:
             return int(decision_date.split('-')[0])
 
         return None
 
-    def extract_case_title(self, soup: BeautifulSoup) -> str:
+    def extract_case_title(self, soup: BeautifulSoup, text: str) -> str:
         """Extract case title"""
         # Try title tag
         title = soup.find('title')
@@ -168,17 +196,14 @@ class CaseLawParser:
                 return title_text
 
         # Try to find "v." or "vs." pattern for case names
-        text = soup.get_text()
         match = re.search(r'([A-Z][a-zA-Z\s,\.]+)\s+v\.?\s+([A-Z][a-zA-Z\s,\.]+)', text)
         if match:
             return f"{match.group(1).strip()} v. {match.group(2).strip()}"
 
         return "Unknown Case"
 
-    def extract_party(self, soup: BeautifulSoup, party_type: str) -> Optional[str]:
+    def extract_party(self, text: str, party_type: str) -> Optional[str]:
         """Extract appellant or appellee"""
-        text = soup.get_text()
-
         if party_type == 'appellant':
             patterns = [r'Appellant[:\s]+([A-Z][^\n,]+)', r'Petitioner[:\s]+([A-Z][^\n,]+)']
         else:
@@ -196,10 +221,8 @@ class CaseLawParser:
         # This is complex - for MVP, return empty list
         return []
 
-    def extract_authoring_judge(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_authoring_judge(self, text: str) -> Optional[str]:
         """Extract judge who wrote the opinion"""
-        text = soup.get_text()
-
         # Patterns: "Winchester, J." or "JUSTICE WINCHESTER"
         patterns = [
             r'([A-Z][a-z]+),\s*J\.',
@@ -221,23 +244,18 @@ class CaseLawParser:
 
     def extract_opinion_text(self, soup: BeautifulSoup) -> str:
         """Extract full opinion text"""
-        # Remove script and style elements
-        for script in soup(['script', 'style', 'meta', 'link']):
-            script.decompose()
-
-        # Get text
+        # get_text() leaves out <script>/<style> contents and <meta>/<link>
+        # carry no text, so the tree is read as-is rather than pruned first
         text = soup.get_text(separator='\n', strip=True)
 
         # Clean up excessive whitespace
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text)
+        text = _SPACES_RE.sub(' ', text)
 
         return text.strip()
 
-    def extract_syllabus(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_syllabus(self, text: str) -> Optional[str]:
         """Extract syllabus/headnotes"""
-        text = soup.get_text()
-
         # Look for syllabus section (often marked with paragraph 0)
         match = re.search(r'¶\s*0\s*(.+?)¶\s*1', text, re.DOTALL)
         if match:
@@ -250,62 +268,40 @@ class CaseLawParser:
         # For MVP, return empty list (would need NLP to extract reliably)
         return []
 
-    def extract_opinion_type(self, soup: BeautifulSoup) -> str:
+    def extract_opinion_type(self, lower_text: str) -> str:
         """Extract opinion type"""
-        text = soup.get_text().lower()
-
-        if 'dissenting' in text:
+        if 'dissenting' in lower_text:
             return 'dissenting'
-        elif 'concurring' in text:
+        elif 'concurring' in lower_text:
             return 'concurring'
-        elif 'per curiam' in text:
+        elif 'per curiam' in lower_text:
             return 'per_curiam'
 
         return 'majority'
 
-    def extract_procedural_posture(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_procedural_posture(self, lower_text: str) -> Optional[str]:
         """Extract procedural posture (affirmed, reversed, etc.)"""
-        text = soup.get_text().lower()
-
         postures = ['affirmed', 'reversed', 'remanded', 'reversed and remanded', 'dismissed']
 
         for posture in postures:
-            if posture in text:
+            if posture in lower_text:
                 return posture
 
         return None
 
-    def extract_statute_citations(self, soup: BeautifulSoup) -> List[str]:
+    def extract_statute_citations(self, text: str) -> List[str]:
         """Extract citations to Oklahoma statutes"""
-        text = soup.get_text()
-
         # Pattern: "43 O.S. § 109" or "Title 43, Section 109"
-        patterns = [
-            r'\d+\s+O\.S\.(?:\s*§|\s+)\s*\d+(?:\.\d+)?',
-            r'Title\s+\d+,\s+Section\s+\d+(?:\.\d+)?'
-        ]
-
-        citations = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            citations.update(matches)
+        # First occurrence of each, in the order they appear
+        citations = dict.fromkeys(_STATUTE_CITATION_RE.findall(text))
 
         return list(citations)[:50]  # Limit to 50 citations
 
-    def extract_case_citations(self, soup: BeautifulSoup) -> List[str]:
+    def extract_case_citations(self, text: str) -> List[str]:
         """Extract citations to other cases"""
-        text = soup.get_text()
-
         # Pattern: "2024 OK 123" or "562 P.3d 1085"
-        patterns = [
-            r'\d{4}\s+OK\s+(?:CR\s+)?\d+',
-            r'\d+\s+P\.\d+d\s+\d+'
-        ]
-
-        citations = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            citations.update(matches)
+        # First occurrence of each, in the order they appear
+        citations = dict.fromkeys(_CASE_CITATION_RE.findall(text))
 
         return list(citations)[:100]  # Limit to 100 citations
 
@@ -319,12 +315,19 @@ class CaseLawScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (Oklahoma Legal Research Bot - Educational Purpose)'
         })
+        # Keep-alive connections shared by the scrape workers
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SCRAPE_WORKERS, max_retries=FETCH_RETRY_POLICY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
         # Initialize Supabase
         self.supabase = create_client(supabase_url, supabase_key)
 
-        self.rate_limit_delay = 2  # seconds between requests
-        self.batch_size = 10  # Insert in batches
+        self.rate_limit_delay = 2  # seconds between one worker's requests
+        # Shared by the scrape workers, so requests start rate_limit_delay /
+        # SCRAPE_WORKERS (0.5s) apart however many run at once
+        self.rate_limiter = RateLimiter(self.rate_limit_delay / SCRAPE_WORKERS)
+        self.batch_size = 500  # Rows per upsert request
 
     def scrape_case(self, cite_id: str, court_type: str, court_database: str) -> Optional[Dict]:
         """
@@ -340,6 +343,8 @@ class CaseLawScraper:
         """
         url = f"https://www.oscn.net/applications/oscn/DeliverDocument.asp?CiteID={cite_id}"
 
+        self.rate_limiter.wait()
+
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
@@ -357,48 +362,75 @@ class CaseLawScraper:
             print(f"  ERROR fetching CiteID {cite_id}: {e}")
             return None
 
+    def iter_scraped_cases(self, cite_ids: List[str], court_type: str, court_database: str) -> Iterator[Tuple[str, Future]]:
+        """
+        Scrape cases concurrently (rate limited by self.rate_limiter)
+
+        Yields (cite_id, future) in input order; future.result() is the
+        scrape_case result (or raises what it raised).
+        """
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as executor:
+            try:
+                # Sliding window: keep SCRAPE_CHUNK_SIZE pages queued so the
+                # workers never wait on the caller between results
+                pending = deque()
+                for cite_id in cite_ids:
+                    pending.append((cite_id, executor.submit(self.scrape_case, cite_id, court_type, court_database)))
+                    if len(pending) >= SCRAPE_CHUNK_SIZE:
+                        yield pending.popleft()
+
+                yield from pending
+            finally:
+                # If the caller stops early (e.g. Ctrl-C closes the generator),
+                # drop the queued pages instead of fetching them all first
+                executor.shutdown(cancel_futures=True)
+
     def scrape_cases_batch(self, cite_ids: List[str], court_type: str, court_database: str) -> List[Dict]:
         """Scrape multiple cases with rate limiting"""
         cases = []
 
-        for i, cite_id in enumerate(cite_ids):
-            print(f"  Scraping {i+1}/{len(cite_ids)}: CiteID {cite_id}")
+        for i, (cite_id, future) in enumerate(self.iter_scraped_cases(cite_ids, court_type, court_database)):
+            print(f"  Scraped {i+1}/{len(cite_ids)}: CiteID {cite_id}")
 
-            case_data = self.scrape_case(cite_id, court_type, court_database)
+            case_data = future.result()
 
             if case_data:
                 cases.append(case_data)
 
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
-
         return cases
 
-    def store_cases(self, cases: List[Dict]) -> int:
+    def store_cases(self, cases: List[Dict]) -> Set[str]:
         """
         Store cases in Supabase
 
         Returns:
-            Number of cases successfully stored
+            cite_ids of the cases successfully stored
         """
+        stored = set()
         if not cases:
-            return 0
-
-        stored_count = 0
+            return stored
 
-        # Insert in batches
+        # Upsert in batches - keyed on cite_id, so re-running a batch is harmless
+        table = self.supabase.table('oklahoma_cases')
         for i in range(0, len(cases), self.batch_size):
             batch = cases[i:i + self.batch_size]
 
             try:
-                result = self.supabase.table('oklahoma_cases').insert(batch).execute()
-                stored_count += len(batch)
-                print(f"  Stored batch: {stored_count}/{len(cases)} cases")
+                table.upsert(batch, on_conflict='cite_id').execute()
+                stored.update(case['cite_id'] for case in batch)
+                print(f"  Stored batch: {len(stored)}/{len(cases)} cases")
 
             except Exception as e:
-                print(f"  ERROR storing batch: {e}")
+                # One bad row fails the whole request; retry row by row to isolate it
+                print(f"  ERROR storing batch: {e} - retrying one at a time")
+                for case in batch:
+                    try:
+                        table.upsert(case, on_conflict='cite_id').execute()
+                        stored.add(case['cite_id'])
+                    except Exception as row_error:
+                        print(f"  ERROR storing CiteID {case['cite_id']}: {row_error}")
 
-        return stored_count
+        return stored
 
 
 def main():
@@ -452,7 +484,7 @@ def main():
         store = input("\nStore this case in Supabase? (y/n): ")
         if store.lower() == 'y':
             stored = scraper.store_cases([case_data])
-            print(f"Stored {stored} case(s)")
+            print(f"Stored {len(stored)} case(s)")
     else:
         print("\nERROR: Failed to parse case")
 
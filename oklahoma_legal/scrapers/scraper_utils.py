@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the OSCN scrapers
+"""
+
+import json
+import threading
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def load_json(filename: str):
+    """Read a JSON file (with orjson when available)"""
+    if ORJSON_AVAILABLE:
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+def save_json(filename: str, data):
+    """Write data as indented JSON (with orjson when available)"""
+    if ORJSON_AVAILABLE:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=2)
+
+class RateLimiter:
+    """Spaces calls to wait() at least `interval` seconds apart, across threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_start = time.monotonic()
+
+    def wait(self):
+        """Block until the caller's turn to send a request"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)